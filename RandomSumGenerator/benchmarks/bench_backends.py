@@ -0,0 +1,64 @@
+"""Crossover timing for the generate_batch backends.
+
+Finds the rows x parts size from which NumPy beats pure Python once imported, the
+value behind backends.CROSSOVER_VALUES. The backends' conformance checks live in
+tests/test_backends.py. Run from the RandomSumGenerator directory:
+
+    python benchmarks/bench_backends.py --output crossover.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from random_sum_generator import RandomSumGenerator  # noqa: E402
+from random_sum_generator.backends import COLD_CROSSOVER_VALUES, CROSSOVER_VALUES  # noqa: E402
+
+PARTS = [2, 8, 32, 128]
+ROWS = [2 ** k for k in range(13)]
+
+
+def timing(n_samples, parts, backend, budget):
+    gen = RandomSumGenerator(seed=0)
+    case = dict(total=10 * parts, parts=parts, min_val=1, max_val=30)
+    gen.generate_batch(n_samples, backend=backend, **case)
+    calls = 0
+    start = time.perf_counter()
+    while calls == 0 or time.perf_counter() - start < budget:
+        gen.generate_batch(n_samples, backend=backend, **case)
+        calls += 1
+    return (time.perf_counter() - start) / calls
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--parts', type=int, nargs='+', default=PARTS)
+    parser.add_argument('--budget', type=float, default=0.05, help="seconds spent timing each size")
+    parser.add_argument('--output', help="write timings as JSON to this path")
+    args = parser.parse_args(argv)
+
+    results = []
+    for parts in args.parts:
+        crossover = None
+        for n in ROWS:
+            pure, numpy = timing(n, parts, 'pure', args.budget), timing(n, parts, 'numpy', args.budget)
+            results.append(dict(parts=parts, rows=n, values=n * parts, pure=pure, numpy=numpy))
+            if crossover is None and numpy < pure:
+                crossover = n * parts
+        print(f"parts={parts:<5} NumPy faster from {crossover} values (rows x parts) on; "
+              f"'auto' switches at {CROSSOVER_VALUES} ({COLD_CROSSOVER_VALUES} before NumPy is imported)")
+
+    if args.output:
+        report = dict(meta=dict(python=platform.python_version(), platform=platform.platform(), created=time.time()),
+                      results=results)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
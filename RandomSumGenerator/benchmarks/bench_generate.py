@@ -0,0 +1,140 @@
+"""Benchmarks for RandomSumGenerator.generate.
+
+Run from the RandomSumGenerator directory:
+
+    python benchmarks/bench_generate.py --output results.json
+    python benchmarks/bench_generate.py --baseline results.json --threshold 0.2
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from random_sum_generator import RandomSumGenerator  # noqa: E402
+from random_sum_generator.core import ARRAY_PARTS  # noqa: E402
+
+PARTS = [10, 100, 1_000, 10_000, 100_000, 1_000_000]
+MODES = ['int', 'float']
+BOUNDS = ['scalar', 'per-part']
+# sum(max_vals) / total: 1.5 is tight, 4.0 is loose.
+TIGHTNESS = [1.5, 4.0]
+
+
+def make_case(parts, mode, bounds, tightness):
+    total = 10 * parts
+    avg = total / parts
+    if bounds == 'scalar':
+        return dict(total=total, parts=parts, min_val=0.2 * avg, max_val=tightness * avg, mode=mode)
+
+    rng = random.Random(parts)
+    weights = [rng.uniform(0.5, 1.5) for _ in range(parts)]
+    scale = parts / sum(weights)
+    max_val = [tightness * avg * w * scale for w in weights]
+    min_val = [0.2 * avg * w * scale for w in weights]
+    return dict(total=total, parts=parts, min_val=min_val, max_val=max_val, mode=mode)
+
+
+def run_case(case, budget, max_samples):
+    gen = RandomSumGenerator(seed=0)
+    spec = gen.compile(**case)
+    method = gen._choose_method(spec, 'auto')
+
+    out = None
+    if spec.parts >= ARRAY_PARTS:
+        import numpy as np
+        out = np.empty(spec.parts, dtype=np.int64 if spec.mode == 'int' else float)
+
+    samples = 0
+    start = time.perf_counter()
+    while samples < max_samples and (samples == 0 or time.perf_counter() - start < budget):
+        gen.generate(spec, out=out, method=method)
+        samples += 1
+    wall = time.perf_counter() - start
+
+    tracemalloc.start()
+    gen.generate(spec, out=out, method=method)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    # Attempts are counted on a separate, instrumented run so timing stays uninstrumented.
+    counted = RandomSumGenerator(seed=0, stats=True)
+    for _ in range(min(samples, 100)):
+        counted.generate(spec, out=out, method=method)
+    mean_attempts = counted.stats.mean_attempts
+
+    return dict(
+        parts=spec.parts,
+        mode=spec.mode,
+        method=method,
+        wall_time=wall,
+        samples=samples,
+        samples_per_sec=samples / wall,
+        mean_attempts=mean_attempts,
+        peak_memory_bytes=peak,
+    )
+
+
+def case_key(result):
+    return f"{result['parts']}/{result['mode']}/{result['bounds']}/{result['tightness']}"
+
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {case_key(r): r for r in json.load(f)['results']}
+
+    regressions = []
+    for result in results:
+        old = baseline.get(case_key(result))
+        if old is None:
+            continue
+        ratio = result['samples_per_sec'] / old['samples_per_sec']
+        if ratio < 1 - threshold:
+            regressions.append((case_key(result), ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--parts', type=int, nargs='+', default=PARTS)
+    parser.add_argument('--budget', type=float, default=0.5, help="seconds spent timing each case")
+    parser.add_argument('--max-samples', type=int, default=10_000)
+    parser.add_argument('--output', help="write results as JSON to this path")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="fail when samples/s drops by more than this fraction versus the baseline")
+    args = parser.parse_args(argv)
+
+    results = []
+    for parts, mode, bounds, tightness in itertools.product(args.parts, MODES, BOUNDS, TIGHTNESS):
+        result = run_case(make_case(parts, mode, bounds, tightness), args.budget, args.max_samples)
+        result.update(bounds=bounds, tightness=tightness)
+        results.append(result)
+        print(f"{case_key(result):32} {result['method']:9} {result['samples_per_sec']:12.1f} samples/s "
+              f"{result['mean_attempts']:8.2f} attempts {result['peak_memory_bytes'] / 1e6:9.2f} MB peak")
+
+    report = dict(
+        meta=dict(python=platform.python_version(), platform=platform.platform(), created=time.time()),
+        results=results,
+    )
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.threshold)
+        for key, ratio in regressions:
+            print(f"REGRESSION {key}: {ratio:.0%} of baseline throughput")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
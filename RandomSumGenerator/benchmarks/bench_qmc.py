@@ -0,0 +1,90 @@
+"""Variance of Monte Carlo estimates from generate_qmc versus independent rows.
+
+The independent rows come from generate_batch with the default method, i.e. the
+same distribution generate_qmc samples, so the means must agree. Each estimator
+is the mean of f(row) over n rows; it is repeated over many seeds, and the ratio
+var(iid) / var(sequence) is how many times more iid rows the same accuracy would
+take. Run from the RandomSumGenerator directory:
+
+    python benchmarks/bench_qmc.py
+    python benchmarks/bench_qmc.py --samples 256 4096 --replicates 400 --output qmc.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from random_sum_generator import RandomSumGenerator  # noqa: E402
+
+CASE = dict(total=100, parts=8, min_val=2, max_val=40, precision=6)
+SAMPLES = [256, 1024, 4096]
+FUNCTIONS = {
+    'sum of squares': lambda x: (x ** 2).sum(axis=1),
+    'max part': lambda x: x.max(axis=1),
+    'first part': lambda x: x[:, 0],
+}
+
+
+def sequences():
+    names = ['halton', 'lhs']
+    try:
+        import scipy.stats  # noqa: F401
+        names.append('sobol')
+    except ImportError:
+        pass
+    return names
+
+
+def estimates(sequence, n, replicates):
+    rows = []
+    for seed in range(replicates):
+        gen = RandomSumGenerator(seed=seed)
+        if sequence == 'iid':
+            x = gen.generate_batch(n, **CASE)
+        else:
+            x = gen.generate_qmc(n, sequence=sequence, **CASE)
+        rows.append([f(x).mean() for f in FUNCTIONS.values()])
+    return np.array(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--samples', type=int, nargs='+', default=SAMPLES)
+    parser.add_argument('--replicates', type=int, default=200)
+    parser.add_argument('--output', help="write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    results = []
+    for n in args.samples:
+        base = estimates('iid', n, args.replicates)
+        for sequence in sequences():
+            start = time.perf_counter()
+            est = estimates(sequence, n, args.replicates)
+            wall = time.perf_counter() - start
+            for k, name in enumerate(FUNCTIONS):
+                ratio = base[:, k].var() / est[:, k].var()
+                results.append(dict(samples=n, sequence=sequence, function=name, variance_ratio=ratio,
+                                    mean_iid=base[:, k].mean(), mean=est[:, k].mean(),
+                                    seconds_per_call=wall / args.replicates))
+                print(f"n={n:<6} {sequence:7} {name:15} {ratio:7.2f}x fewer samples  "
+                      f"mean {est[:, k].mean():10.4f} (iid {base[:, k].mean():10.4f})")
+
+    if args.output:
+        report = dict(
+            meta=dict(python=platform.python_version(), platform=platform.platform(), created=time.time(),
+                      case=CASE, replicates=args.replicates),
+            results=results,
+        )
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
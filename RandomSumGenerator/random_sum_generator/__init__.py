@@ -1 +1,3 @@
-from .core import RandomSumGenerator
\ No newline at end of file
+from .core import RandomSumGenerator
+from .spec import GenerationSpec
+from .stats import GenerationStats
@@ -0,0 +1,62 @@
+import asyncio
+import threading
+from functools import partial
+
+from .backends import choose
+
+# How long the first request for a spec waits for others to join its batch.
+WINDOW = 0.002
+MAX_BATCH = 4096
+
+
+class Coalescer:
+    # Collects concurrent agenerate() calls on one event loop. Requests that share
+    # (spec, method, max_attempts) within `window` seconds become one generate_batch
+    # call in an executor, and each waiter gets its own row back.
+    def __init__(self, gen, loop, max_batch=MAX_BATCH):
+        self.gen = gen
+        self.loop = loop
+        self.max_batch = max_batch
+        self.pending = {}
+        # The generator's streams are not thread-safe; batches run one at a time.
+        self.lock = threading.Lock()
+
+    def submit(self, key, window, executor):
+        future = self.loop.create_future()
+        if key in self.pending:
+            waiters = self.pending[key][0]
+            waiters.append(future)
+            if len(waiters) >= self.max_batch:
+                self.flush(key)
+        else:
+            timer = self.loop.call_later(window, self.flush, key)
+            self.pending[key] = ([future], timer, executor)
+        return future
+
+    def flush(self, key):
+        entry = self.pending.pop(key, None)
+        if entry is None:
+            return
+        waiters, timer, executor = entry
+        timer.cancel()
+        job = self.loop.run_in_executor(executor, self.run, key, len(waiters))
+        job.add_done_callback(partial(self.deliver, waiters))
+
+    def run(self, key, n):
+        spec, method, max_attempts = key
+        with self.lock:
+            engine = choose('auto', n, spec)
+            return engine.rows(self.gen.generate_batch(n, spec, max_attempts=max_attempts, method=method,
+                                                       backend=engine.name))
+
+    @staticmethod
+    def deliver(waiters, job):
+        error = asyncio.CancelledError() if job.cancelled() else job.exception()
+        rows = None if error else job.result()
+        for i, future in enumerate(waiters):
+            if future.done():
+                continue
+            if error:
+                future.set_exception(error)
+            else:
+                future.set_result(rows[i])
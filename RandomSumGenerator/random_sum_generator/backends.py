@@ -0,0 +1,67 @@
+import importlib.util
+import sys
+
+# From this many values per call (rows x parts) on, 'auto' picks NumPy: below it,
+# NumPy's fixed per-call cost isn't paid back (benchmarks/bench_backends.py
+# measures 32-128). Until NumPy has been imported, its ~0.1 s import counts too,
+# which pure Python spends on roughly COLD_CROSSOVER_VALUES values.
+CROSSOVER_VALUES = 64
+COLD_CROSSOVER_VALUES = 32_768
+
+
+class PureBackend:
+    # The per-sample engines in core, on the generator's random.Random stream.
+    # Always available; returns a list of rows.
+    name = 'pure'
+
+    def available(self):
+        return True
+
+    def sample(self, gen, n_samples, spec, max_attempts, method):
+        return [gen._sample_one(spec, method, max_attempts) for _ in range(n_samples)]
+
+    def rows(self, result):
+        return result
+
+
+class NumpyBackend:
+    # The vectorized engines in batch, on the generator's NumPy stream. NumPy is
+    # imported on first use only, so importing the package stays cheap.
+    name = 'numpy'
+
+    def __init__(self):
+        self._available = None
+
+    def available(self):
+        if self._available is None:
+            self._available = importlib.util.find_spec('numpy') is not None
+        return self._available
+
+    def sample(self, gen, n_samples, spec, max_attempts, method):
+        from . import batch
+        return batch.sample(gen._numpy_rng(), n_samples, spec, max_attempts, method, gen.stats)
+
+    def rows(self, result):
+        return result.tolist()
+
+
+BACKENDS = {'pure': PureBackend(), 'numpy': NumpyBackend()}
+
+
+def register(name, backend):
+    # A backend needs available(), sample(gen, n_samples, spec, max_attempts, method)
+    # and rows(result) -> list of rows.
+    BACKENDS[name] = backend
+
+
+def choose(name, n_samples, spec):
+    if name == 'auto':
+        numpy = BACKENDS['numpy']
+        threshold = CROSSOVER_VALUES if 'numpy' in sys.modules else COLD_CROSSOVER_VALUES
+        return numpy if n_samples * spec.parts >= threshold and numpy.available() else BACKENDS['pure']
+    if name not in BACKENDS:
+        raise ValueError(f"backend must be 'auto' or one of {tuple(BACKENDS)}")
+    backend = BACKENDS[name]
+    if not backend.available():
+        raise RuntimeError(f"The {name!r} backend is not available; install NumPy or use backend='pure'.")
+    return backend
@@ -0,0 +1,267 @@
+import random
+from decimal import Decimal
+from time import perf_counter
+
+import numpy as np
+
+from .compositions import sample_dp as _sample_dp_row
+from .exact import truncated_beta1
+
+
+def sample(rng, n_samples, spec, max_attempts, method, stats=None):
+    return to_output(sample_units(rng, n_samples, spec, max_attempts, method, stats), spec.units()[0], spec.mode,
+                     spec.precision)
+
+
+def sample_units(rng, n_samples, spec, max_attempts, method, stats=None, out=None):
+    # `out`, an (n_samples, parts) int64 array, receives the rows instead of a new one.
+    if method in ('rejection', 'dirichlet'):
+        return sample_rejection(rng, n_samples, spec, max_attempts, stats, method, out)
+    units = (sample_dp if method == 'dp' else sample_exact)(rng, n_samples, spec, out)
+    if stats is not None:
+        stats.record_call(method, n_samples, n_samples)
+    return units
+
+
+def sample_into(rng, out, spec, max_attempts, method, stats=None):
+    # generate_batch(out=...): the engine writes straight into `out` (check_out
+    # has passed). A C-contiguous float64 `out` is reused as the int64 unit buffer
+    # and divided in place, so no second (n, parts) array is ever allocated.
+    n_samples = out.shape[0]
+    scale = spec.units()[0]
+    direct = out.dtype == np.int64 or (out.dtype == np.float64 and out.flags.c_contiguous)
+    units = sample_units(rng, n_samples, spec, max_attempts, method, stats, out.view(np.int64) if direct else None)
+    if spec.mode == 'float':
+        np.divide(units, scale, out=out)
+    elif not direct:
+        out[...] = units
+    return out
+
+
+def to_output(units, scale, mode, precision):
+    # Unit-grid array to the output mode, as spec.from_units does for one row.
+    if mode == 'int':
+        return units
+    if mode == 'decimal':
+        return np.frompyfunc(lambda v: Decimal(v).scaleb(-precision), 1, 1)(units.astype(object))
+    return units / scale
+
+
+def sample_dp(rng, n_samples, spec, out=None):
+    # The counting tables hold exact big integers, so rows are walked one at a time
+    # on a stream seeded from the batch generator.
+    row_rng = random.Random(int(rng.integers(2 ** 63)))
+    if out is None:
+        out = np.empty((n_samples, spec.parts), dtype=np.int64)
+    for i in range(n_samples):
+        out[i] = _sample_dp_row(row_rng, spec)
+    return out
+
+
+def propose(scaled, spec, method):
+    # Raw gamma draws (n, parts) -> candidate rows on the unit grid.
+    lo, _, span = spec.arrays()
+    return propose_rows(scaled, spec.unit_arrays()[1], lo, span, method)
+
+
+def compose(rng, totals, parts):
+    # Uniform compositions of each total into `parts` non-negative grid values: a
+    # flat Dirichlet-multinomial, whose pmf is constant. Shifted by the minimums and
+    # checked against the caps, this is exactly what 'dp' samples.
+    weights = rng.standard_exponential((np.size(totals), parts))
+    weights /= weights.sum(axis=1, keepdims=True)
+    return rng.multinomial(totals, weights)
+
+
+def propose_rows(scaled, units_total, lo, span, method):
+    # As propose, with the total and bounds given directly; units_total may be a
+    # (n, 1) column and lo/span (n, parts) for a different problem per row.
+    if method == 'rejection':
+        scaled /= scaled.sum(axis=1, keepdims=True)
+        scaled = lo + scaled * span
+    scaled *= units_total / scaled.sum(axis=1, keepdims=True)
+
+    # Largest-remainder rounding on the unit grid, as in core._draw.
+    adjusted = np.floor(scaled)
+    short = units_total - adjusted.sum(axis=1, keepdims=True)
+    rank = np.argsort(np.argsort(adjusted - scaled, axis=1), axis=1)
+    adjusted += rank < short
+    return adjusted.astype(np.int64)
+
+
+def sample_rejection(rng, n_samples, spec, max_attempts, stats=None, method='rejection', out=None):
+    _, units_total, lo_units, caps = spec.unit_arrays()
+    parts = spec.parts
+
+    alpha = spec.alpha_array()
+    if out is None:
+        out = np.empty((n_samples, parts), dtype=np.int64)
+    pending = np.arange(n_samples)
+    drawn = 0
+
+    # Each round redraws only the rows rejected so far, so a row never gets more
+    # than max_attempts draws — the same budget a single generate() call has.
+    for attempt in range(max_attempts):
+        if pending.size == 0:
+            break
+        if stats is not None:
+            started = perf_counter()
+        drawn += pending.size
+        if method == 'dirichlet' and spec.flat:
+            adjusted = compose(rng, np.full(pending.size, units_total - int(lo_units.sum())), parts) + lo_units
+        else:
+            adjusted = propose(rng.standard_gamma(alpha, size=(pending.size, parts)), spec, method)
+
+        if stats is not None:
+            checked = perf_counter()
+        shifted = adjusted - lo_units
+        ok = ((shifted >= 0) & (shifted <= caps)).all(axis=1)
+        if stats is not None:
+            stats.sampling_time += checked - started
+            stats.checking_time += perf_counter() - checked
+            stats.record_array_violations(shifted[~ok], caps)
+        out[pending[ok]] = adjusted[ok]
+        pending = pending[~ok]
+
+    if pending.size:
+        if stats is not None:
+            stats.record_failure(method, drawn)
+        raise RuntimeError(f"Failed to generate valid output for {pending.size} rows in {max_attempts} attempts.")
+    if stats is not None:
+        stats.record_call(method, n_samples, drawn)
+    return out
+
+
+def sample_exact(rng, n_samples, spec, out=None):
+    _, units_total, lo, caps = spec.unit_arrays()
+    shape = (n_samples, spec.parts)
+    return sample_exact_rows(rng, np.full(n_samples, units_total, dtype=np.int64), np.broadcast_to(lo, shape),
+                             np.broadcast_to(caps, shape), out=out)
+
+
+def sample_exact_rows(rng, totals, lo, caps, sizes=None, uniforms=None, out=None):
+    # Same sequential construction as exact.sample_exact (feasible by construction,
+    # not uniform once upper bounds bind), one column of every row per step. Each
+    # row has its own total and bounds; with `sizes`, row i only uses its first
+    # sizes[i] columns (the rest is padding and stays 0). `uniforms`
+    # (n, 2 * parts - 1) replaces the draws from rng; `out` receives the rows.
+    n_samples, parts = lo.shape
+    rows = np.arange(n_samples)
+    keys = rng.random((n_samples, parts)) if uniforms is None else uniforms[:, :parts].copy()
+    if sizes is not None:
+        keys[np.arange(parts) >= sizes[:, None]] = 2.0
+    order = np.argsort(keys, axis=1)
+    if out is None:
+        values = np.array(lo, dtype=np.int64)
+    else:
+        values = out
+        values[...] = lo
+    remaining = totals - values.sum(axis=1)
+    cap_after = caps.sum(axis=1)
+    last = parts - 1 if sizes is None else sizes - 1
+
+    for k in range(parts - 1):
+        idx = order[:, k]
+        cap = caps[rows, idx]
+        cap_after -= cap
+        a = np.maximum(0, remaining - cap_after)
+        b = np.minimum(cap, remaining)
+        span = remaining + 1.0
+        m = last - k
+        u = rng.random(n_samples) if uniforms is None else uniforms[:, parts + k]
+        y = np.floor(truncated_beta1(u, np.maximum(m, 1), a / span, (b + 1) / span) * span)
+        y = np.clip(y.astype(np.int64), a, b)
+        if sizes is not None:
+            y[m <= 0] = 0
+        values[rows, idx] += y
+        remaining -= y
+    values[rows, order[rows, last]] += remaining
+    return values
+
+
+def check_out(out, shape, spec):
+    if spec.mode == 'decimal':
+        raise ValueError("out= is only supported for 'int' and 'float' modes.")
+    if out.shape != shape:
+        raise ValueError(f"out must have shape {shape}, got {out.shape}.")
+    expected = np.integer if spec.mode == 'int' else np.floating
+    if not np.issubdtype(out.dtype, expected):
+        raise ValueError(f"out must have a{'n integer' if spec.mode == 'int' else ' float'} dtype for mode "
+                         f"{spec.mode!r}, got {out.dtype}.")
+
+
+def _attempt_into(rng, spec, work, scratch, stats=None, method='rejection'):
+    # One rejection attempt for a single vector, entirely in place: `work` ends up
+    # holding grid values and `scratch` is the only other parts-sized buffer.
+    lo, _, span = spec.arrays()
+    _, units_total, lo_units, caps = spec.unit_arrays()
+
+    if stats is not None:
+        started = perf_counter()
+    if method == 'dirichlet' and spec.flat:
+        work[...] = compose(rng, units_total - int(lo_units.sum()), spec.parts)[0]
+        work += lo_units
+    else:
+        if spec.flat:
+            rng.standard_exponential(out=work)
+        else:
+            rng.standard_gamma(spec.alpha_array(), out=work)
+        if method == 'rejection':
+            work /= work.sum()
+            np.multiply(work, span, out=work)
+            work += lo
+        work *= units_total / work.sum()
+
+        np.floor(work, out=scratch)
+        np.subtract(work, scratch, out=work)
+        short = int(round(units_total - scratch.sum()))
+        if short > 0:
+            scratch[np.argpartition(work, work.size - short)[work.size - short:]] += 1
+        work[...] = scratch
+
+    if stats is not None:
+        checked = perf_counter()
+    np.subtract(work, lo_units, out=scratch)
+    accepted = bool((scratch >= 0).all() and (scratch <= caps).all())
+    if stats is not None:
+        stats.sampling_time += checked - started
+        stats.checking_time += perf_counter() - checked
+        if not accepted:
+            stats.record_array_violations(scratch[None, :], caps)
+    return accepted
+
+
+def write_units(out, units, spec):
+    # One row of grid units (a list from the pure-Python engines) into `out`.
+    out[...] = units
+    if spec.mode == 'float':
+        out /= spec.units()[0]
+    return out
+
+
+def generate_into(rng, spec, out, max_attempts, method, stats=None):
+    # The rejection engines for a single vector; see write_units for 'exact' and 'dp'.
+    check_out(out, (spec.parts,), spec)
+    scale = spec.units()[0]
+
+    work = out if out.dtype == np.float64 else np.empty(spec.parts)
+    scratch = np.empty(spec.parts)
+    for attempt in range(max_attempts):
+        if _attempt_into(rng, spec, work, scratch, stats, method):
+            if spec.mode != 'int':
+                work /= scale
+            if work is not out:
+                out[...] = work
+            if stats is not None:
+                stats.record_call(method, 1, attempt + 1)
+            return out
+    if stats is not None:
+        stats.record_failure(method, max_attempts)
+    raise RuntimeError(f"Failed to generate valid output in {max_attempts} attempts.")
+
+
+def estimate_acceptance(spec, trials, method='rejection'):
+    rng = np.random.default_rng(0)
+    work = np.empty(spec.parts)
+    scratch = np.empty(spec.parts)
+    return sum(_attempt_into(rng, spec, work, scratch, None, method) for _ in range(trials)) / trials
@@ -0,0 +1,192 @@
+import argparse
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+from .core import METHODS, RandomSumGenerator
+from .spec import MODES
+
+FORMATS = ('csv', 'npy', 'parquet', 'raw')
+CHUNK_SIZE = 65536
+# Each chunk is cut into this many shards, so the output depends on --seed and
+# --chunk-size but never on --workers.
+SHARDS_PER_CHUNK = 16
+
+
+def _numpy():
+    # Imported on use, so a missing NumPy is a clean `rsg: error` rather than a traceback.
+    try:
+        import numpy as np
+    except ImportError:
+        raise RuntimeError("rsg needs NumPy: pip install random_sum_generator[numpy]") from None
+    return np
+
+
+def _number(text):
+    value = float(text)
+    return int(value) if value.is_integer() and '.' not in text and 'e' not in text.lower() else value
+
+
+def _bounds(text):
+    values = [_number(v) for v in text.split(',')]
+    return values[0] if len(values) == 1 else values
+
+
+def _columns(parts):
+    return [f"p{i}" for i in range(parts)]
+
+
+# Writers check their arguments and dependencies on construction and touch the
+# output only in open(), so a bad --format never truncates an existing -o FILE.
+class CsvWriter:
+    def __init__(self, spec, header=True):
+        self.np = _numpy()
+        self.columns = _columns(spec.parts) if header else None
+        self.fmt = '%d' if spec.mode == 'int' else '%s' if spec.mode == 'decimal' else f"%.{spec.precision}f"
+
+    def open(self, stream):
+        self.stream = stream
+        if self.columns:
+            stream.write((','.join(self.columns) + '\n').encode())
+
+    def write(self, chunk):
+        self.np.savetxt(self.stream, chunk, fmt=self.fmt, delimiter=',')
+
+    def close(self):
+        self.stream.flush()
+
+
+class NpyWriter:
+    # The header carries the final shape, so it is written up front and the rows
+    # follow chunk by chunk; the file never has to be held in memory.
+    def __init__(self, spec, n_samples):
+        if spec.mode == 'decimal':
+            raise ValueError("NPY output does not support mode='decimal'; use 'float' or 'int'.")
+        np = self.np = _numpy()
+        self.dtype = np.dtype(np.int64 if spec.mode == 'int' else np.float64)
+        self.header = {'descr': np.lib.format.dtype_to_descr(self.dtype), 'fortran_order': False,
+                       'shape': (n_samples, spec.parts)}
+
+    def open(self, stream):
+        self.stream = stream
+        self.np.lib.format.write_array_header_1_0(stream, self.header)
+
+    def write(self, chunk):
+        self.stream.write(self.np.ascontiguousarray(chunk, dtype=self.dtype).tobytes())
+
+    def close(self):
+        self.stream.flush()
+
+
+class ParquetWriter:
+    def __init__(self, spec):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet output needs pyarrow: pip install pyarrow") from None
+        if spec.mode == 'int':
+            dtype = pa.int64()
+        elif spec.mode == 'decimal':
+            dtype = pa.decimal128(38, spec.precision)
+        else:
+            dtype = pa.float64()
+        self.pa, self.pq = pa, pq
+        self.schema = pa.schema([(name, dtype) for name in _columns(spec.parts)])
+
+    def open(self, stream):
+        self.writer = self.pq.ParquetWriter(stream, self.schema)
+
+    def write(self, chunk):
+        columns = [self.pa.array(chunk[:, i], type=field.type) for i, field in enumerate(self.schema)]
+        self.writer.write_table(self.pa.Table.from_arrays(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def _writer(fmt, spec, n_samples, header):
+    if fmt == 'csv':
+        return CsvWriter(spec, header)
+    if fmt == 'npy':
+        return NpyWriter(spec, n_samples)
+    return ParquetWriter(spec)
+
+
+def generate(args):
+    _numpy()
+    gen = RandomSumGenerator(seed=args.seed)
+    spec = gen.compile(args.total, args.parts, args.min, args.max, args.mode, args.precision, args.alpha)
+    # Resolved (and validated) before anything touches -o FILE.
+    method = gen._choose_method(spec, args.method, vectorized=True)
+    shard_size = -(-args.chunk_size // SHARDS_PER_CHUNK)
+    if args.format == 'raw':
+        # Written in place by path, so an interrupted run picks up at its last completed chunk.
+        gen.generate_file(args.output, args.n, spec, max_attempts=args.max_attempts, method=method,
+                          chunk_size=args.chunk_size, resume=not args.restart)
+        return 0
+
+    writer = _writer(args.format, spec, args.n, not args.no_header)
+    stream = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+    pool = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 1 else nullcontext()
+    try:
+        with pool:
+            executor = pool if args.workers > 1 else None
+            writer.open(stream)
+            for start in range(0, args.n, args.chunk_size):
+                n = min(args.chunk_size, args.n - start)
+                writer.write(gen.generate_many(n, spec, max_attempts=args.max_attempts, method=method,
+                                               workers=1, shard_size=shard_size, executor=executor))
+            writer.close()
+    finally:
+        if stream is not sys.stdout.buffer:
+            stream.close()
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='rsg', description="Generate random numbers that sum to a total.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    gen = commands.add_parser('generate', help="stream samples to a CSV, NPY, Parquet or raw file")
+    gen.add_argument('--total', type=_number, required=True)
+    gen.add_argument('--parts', type=int, required=True)
+    gen.add_argument('--min', type=_bounds, default=0, help="scalar or comma-separated per-part lower bounds")
+    gen.add_argument('--max', type=_bounds, default=None, help="scalar or comma-separated per-part upper bounds")
+    gen.add_argument('--mode', choices=MODES, default='float')
+    gen.add_argument('--precision', type=int, default=2)
+    gen.add_argument('--alpha', type=_bounds, default=1.0, help="Dirichlet concentration, scalar or per-part")
+    gen.add_argument('--method', choices=METHODS, default='auto')
+    gen.add_argument('--max-attempts', type=int, default=1000)
+    gen.add_argument('-n', type=int, required=True, help="number of samples (rows)")
+    gen.add_argument('--format', choices=FORMATS, default='csv')
+    gen.add_argument('-o', '--output', default='-', help="output path, '-' for stdout (default)")
+    gen.add_argument('--no-header', action='store_true', help="omit the CSV header row")
+    gen.add_argument('--restart', action='store_true', help="with --format raw, overwrite instead of resuming")
+    gen.add_argument('--seed', type=int, default=None)
+    gen.add_argument('--workers', type=int, default=1)
+    gen.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                     help="rows generated and written per step; bounds memory use")
+    gen.set_defaults(run=generate)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.n < 0 or args.chunk_size < 1 or args.workers < 1:
+        parser.error("-n must be >= 0, --chunk-size and --workers >= 1")
+    if args.format == 'raw' and args.output == '-':
+        parser.error("--format raw writes to a file; pass -o PATH")
+    try:
+        return args.run(args)
+    except (ValueError, RuntimeError) as e:
+        parser.exit(2, f"rsg: error: {e}\n")
+    except BrokenPipeError:
+        # e.g. `rsg generate ... | head`
+        sys.stderr.close()
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+import bisect
+import math
+import threading
+from collections import OrderedDict
+from itertools import accumulate
+
+# Upper bound on the memory held across all cached tables. Counts are Python
+# bigints, so a cell costs a list slot plus an int whose size grows with the
+# count: budgeting by cells alone let one table reach hundreds of MB.
+MAX_TABLE_BYTES = 64 * 2 ** 20
+
+
+def _row_bytes(length, bits):
+    # A list of `length` ints of at most `bits` bits (CPython: 30-bit digits).
+    return 56 + length * (8 + 28 + 4 * -(-int(bits) // 30))
+
+
+def table_bytes(remaining, caps):
+    # Upper bound on CountTable(remaining, caps)'s memory, without building it. Row
+    # k counts the ways parts k..n-1 sum to at most r, so its largest entry is at
+    # most C(remaining + m, m) for m = n - k parts, and at most prod(cap + 1).
+    parts = len(caps)
+    nbytes = _row_bytes(remaining + 1, 0)
+    log_prod = 0.0
+    for m in range(1, parts):
+        log_prod += math.log2(caps[parts - m] + 1)
+        log_binom = (math.lgamma(remaining + m + 1) - math.lgamma(remaining + 1) - math.lgamma(m + 1)) / math.log(2)
+        nbytes += _row_bytes(remaining + 1, math.ceil(min(log_prod, log_binom)) + 1)
+    return nbytes
+
+
+class CountTable:
+    # prefix[k][r] = number of ways parts k..n-1 can sum to at most r (shifted so
+    # every lower bound is 0). Walking it gives exactly uniform compositions.
+    __slots__ = ('remaining', 'caps', 'prefix', 'nbytes')
+
+    def __init__(self, remaining, caps):
+        parts = len(caps)
+        prefix = [None] * (parts + 1)
+        prefix[parts] = [1] * (remaining + 1)
+        for k in range(parts - 1, 0, -1):
+            above, cap = prefix[k + 1], caps[k]
+            counts = [above[r] - above[r - cap - 1] if r > cap else above[r] for r in range(remaining + 1)]
+            prefix[k] = list(accumulate(counts))
+
+        self.remaining = remaining
+        self.caps = caps
+        self.prefix = prefix
+        self.nbytes = sum(_row_bytes(len(row), row[-1].bit_length()) for row in prefix[1:])
+
+    def sample(self, rng):
+        values = []
+        r = self.remaining
+        for k in range(len(self.caps) - 1):
+            counts = self.prefix[k + 1]
+            low = r - min(self.caps[k], r)
+            base = counts[low - 1] if low > 0 else 0
+            u = base + rng.randrange(counts[r] - base)
+            s = bisect.bisect_right(counts, u, low, r + 1)
+            values.append(r - s)
+            r = s
+        values.append(r)
+        return values
+
+
+class TableCache:
+    # LRU keyed by (remaining, caps), evicting by total bytes rather than entry count.
+    def __init__(self, max_bytes=MAX_TABLE_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._tables = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, remaining, caps):
+        # The cached or newly built table; None when it wouldn't fit the budget.
+        key = (remaining, caps)
+        with self._lock:
+            table = self._tables.get(key)
+            if table is not None:
+                self._tables.move_to_end(key)
+                return table
+        if table_bytes(remaining, caps) > self.max_bytes:
+            return None
+
+        table = CountTable(remaining, caps)
+        with self._lock:
+            if key not in self._tables:
+                self._tables[key] = table
+                self.nbytes += table.nbytes
+            while self.nbytes > self.max_bytes and len(self._tables) > 1:
+                _, evicted = self._tables.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+        return table
+
+    def clear(self):
+        with self._lock:
+            self._tables.clear()
+            self.nbytes = 0
+
+
+TABLES = TableCache()
+
+
+def _shifted(spec):
+    scale, units_total, lo, caps = spec.units()
+    return units_total - sum(lo), tuple(caps)
+
+
+def sample_dp(rng, spec):
+    lo = spec.units()[2]
+    remaining, caps = _shifted(spec)
+    table = TABLES.get(remaining, caps)
+    if table is None:
+        raise ValueError(f"Problem too large for the DP engine ({len(caps)} parts x {remaining + 1} values, "
+                         f"~{table_bytes(remaining, caps) / 2 ** 20:.0f} MB of counts). "
+                         f"Use method='dirichlet' (uniform) or 'exact' (never rejects, not uniform).")
+    shifted = table.sample(rng)
+    return [l + y for l, y in zip(lo, shifted)]
@@ -1,72 +1,592 @@
 import random
 import logging
+import hashlib
+import math
+import os
+from functools import lru_cache
+
+from .compositions import TABLES, sample_dp, table_bytes
+from .exact import sample_exact
+from .spec import Broadcast, GenerationSpec
+from .stats import GenerationStats
 
 logger = logging.getLogger(__name__)
 
+METHODS = ('auto', 'dirichlet', 'rejection', 'exact', 'dp')
+
+# Relative cost of one attempt per part, measured on the pure-Python engines.
+ENGINE_COSTS = {'dirichlet': 1.0, 'rejection': 1.1, 'dp': 1.6, 'exact': 1.8}
+# The same on the NumPy batch engines, in the same unit: 'dp' still walks its
+# table row by row in Python, so vectorized 'dirichlet' is ~20x cheaper.
+VECTOR_COSTS = {'dirichlet': 0.08, 'rejection': 0.04, 'exact': 0.07, 'dp': 1.6}
+
+# 'auto' switches between engines that sample the same distribution, so its
+# choice doesn't change the output's law: the uniform split within the bounds for
+# alpha=1 ('dp' on the unit grid, 'dirichlet'), the bounded Dirichlet otherwise.
+# Only when neither is practical does it fall back to 'rejection', or to 'exact'
+# (which never rejects); both sample other distributions, and plan() and
+# last_method say so.
+# 'dp' tables up to this size build in a few ms, so 'auto' weighs them against
+# 'dirichlet' by per-sample cost alone; larger ones are a last resort.
+DP_BUILD_BYTES = 4 * 2 ** 20
+# Below this Dirichlet acceptance, 'auto' builds a larger 'dp' table instead when one fits.
+MIN_ACCEPTANCE = 0.05
+
+# From this many parts on, the acceptance pilot runs in place on NumPy buffers.
+ARRAY_PARTS = 10_000
+
+
+def _to_grid(exact, units_total):
+    # Fixed-point rounding: floor every part on the unit grid, then hand the
+    # leftover units to the parts with the largest remainders. The sum is exact
+    # and no part moves by more than one unit.
+    adjusted = [math.floor(x) for x in exact]
+    short = units_total - sum(adjusted)
+    if short > 0:
+        for i in sorted(range(len(exact)), key=lambda i: adjusted[i] - exact[i])[:short]:
+            adjusted[i] += 1
+    return adjusted
+
+
+def _gammas(rng, spec):
+    alpha = spec.alpha
+    if isinstance(alpha, Broadcast):
+        return [rng.gammavariate(alpha.value, 1) for _ in range(spec.parts)]
+    return [rng.gammavariate(a, 1) for a in alpha]
+
+
+def _draw(rng, spec):
+    # Dirichlet proportions scaled into [min, max], then rescaled to the total.
+    units_total = spec.units()[1]
+    min_vals, _, ranges = spec.bounds()
+    parts = spec.parts
+    raw = _gammas(rng, spec)
+    total_raw = sum(raw)
+    proportions = [r / total_raw for r in raw]
+    scaled = [min_vals[i] + proportions[i] * ranges[i] for i in range(parts)]
+    factor = units_total / sum(scaled)
+    return _to_grid([s * factor for s in scaled], units_total)
+
+
+def _draw_dirichlet(rng, spec):
+    # Dirichlet split of the total; conditioned on the bounds this is the Dirichlet
+    # restricted to the box. With alpha=1 it splits what is left above the minimums
+    # into a uniform grid composition instead (stars and bars: parts - 1 distinct
+    # cut points), so after the cap check it samples exactly what 'dp' does.
+    _, units_total, lo, _ = spec.units()
+    if not spec.flat:
+        raw = _gammas(rng, spec)
+        factor = units_total / sum(raw)
+        return _to_grid([r * factor for r in raw], units_total)
+    slots = units_total - sum(lo) + spec.parts - 1
+    cuts = [-1] + sorted(rng.sample(range(slots), spec.parts - 1)) + [slots]
+    return [l + cuts[i + 1] - cuts[i] - 1 for i, l in enumerate(lo)]
+
+
+DRAWS = {'dirichlet': _draw_dirichlet, 'rejection': _draw}
+
+
+def _within(units, spec):
+    lo, caps = spec.units()[2:]
+    return all(0 <= units[i] - lo[i] <= caps[i] for i in range(len(units)))
+
+
+def _estimate_acceptance(spec, method='rejection'):
+    # Pilot run of a rejection engine on a private, fixed-seed stream so the
+    # estimate is deterministic and never consumes the caller's random state.
+    # Cached on the spec, so it is freed with it.
+    return spec.memo(('acceptance', method), lambda: _pilot(spec, method))
+
+
+def _pilot(spec, method):
+    trials = min(64, max(4, 50000 // spec.parts))
+    if spec.parts >= ARRAY_PARTS:
+        try:
+            from .batch import estimate_acceptance
+        except ImportError:
+            pass
+        else:
+            return estimate_acceptance(spec, trials, method)
+    rng = random.Random(0)
+    draw = DRAWS[method]
+    return sum(_within(draw(rng, spec), spec) for _ in range(trials)) / trials
+
+
+def _dirichlet_acceptance_bound(spec):
+    # A flat Dirichlet split of what is left above the lower bounds, R, gives each
+    # part R * Beta(1, n - 1) on top of its minimum, so P(part i over its range r)
+    # is (1 - r/R)^(n-1). A union bound over those events is a lower bound on the
+    # acceptance rate.
+    min_vals, _, ranges = spec.bounds()
+    n, remaining = spec.parts, spec.total - sum(min_vals)
+    if n == 1 or remaining <= 0:
+        return 1.0
+    miss = 0.0
+    for r in ranges:
+        if r < remaining:
+            miss += (1 - max(r / remaining, 0)) ** (n - 1)
+        if miss >= 1:
+            return 0.0
+    return 1 - miss
+
+
+def _dp_bytes(spec):
+    _, units_total, lo, caps = spec.units()
+    return table_bytes(units_total - sum(lo), caps)
+
+
+def _plan(spec, vectorized=False):
+    # (method, acceptance, dp table bytes). The table size is the one-off build
+    # cost of 'dp' (None when 'dp' doesn't apply); a plan never depends on what
+    # happens to be cached, so 'auto' is reproducible across runs. `vectorized`
+    # weighs the engines by their NumPy batch costs. Plans are cached on the spec:
+    # a module-level cache would keep every spec (and its per-part bounds) alive.
+    return spec.memo(('plan', vectorized), lambda: _make_plan(spec, vectorized))
+
+
+def _make_plan(spec, vectorized):
+    costs = VECTOR_COSTS if vectorized else ENGINE_COSTS
+    acceptance = {}
+    dp_bytes = _dp_bytes(spec) if spec.flat else None
+    if dp_bytes is not None:
+        acceptance['dp'] = 1.0
+    cheap_dp = dp_bytes is not None and dp_bytes <= DP_BUILD_BYTES
+
+    acceptance['dirichlet'] = _dirichlet_acceptance_bound(spec) if spec.flat else 0.0
+    settles = max(costs['dirichlet'] / costs['dp'], MIN_ACCEPTANCE) if cheap_dp else MIN_ACCEPTANCE
+    if acceptance['dirichlet'] < settles:
+        # The analytic bound is loose when bounds bind; measure instead.
+        acceptance['dirichlet'] = _estimate_acceptance(spec, 'dirichlet')
+    if cheap_dp and costs['dp'] < costs['dirichlet'] / max(acceptance['dirichlet'], 1e-12):
+        return 'dp', acceptance, dp_bytes
+    if acceptance['dirichlet'] >= MIN_ACCEPTANCE:
+        return 'dirichlet', acceptance, dp_bytes
+    if dp_bytes is not None and dp_bytes <= TABLES.max_bytes:
+        return 'dp', acceptance, dp_bytes
+    if acceptance['dirichlet'] > 0:
+        return 'dirichlet', acceptance, dp_bytes
+
+    if not spec.flat:
+        # 'dirichlet' is the only engine for this law. A pilot that accepted none of
+        # its 64 draws only says acceptance is low, not zero; max_attempts decides.
+        return 'dirichlet', acceptance, dp_bytes
+    # No uniform engine is practical: fall back to the baseline's scaled proposal,
+    # or to 'exact' when that rejects too often.
+    if not spec.tight_upper:
+        acceptance['rejection'] = _estimate_acceptance(spec, 'rejection')
+        if acceptance['rejection'] >= MIN_ACCEPTANCE:
+            return 'rejection', acceptance, dp_bytes
+    acceptance['exact'] = 1.0
+    return 'exact', acceptance, dp_bytes
+
+
+def _freeze(val):
+    return tuple(val) if isinstance(val, list) else val
+
+
+# Specs are hashable, so identical argument sets compile once and are reused.
+_compile = lru_cache(maxsize=1024)(GenerationSpec)
+
+
+def _entropy(seed):
+    if seed is None:
+        return random.SystemRandom().getrandbits(128)
+    if isinstance(seed, int) and seed >= 0:
+        return seed
+    return int.from_bytes(hashlib.sha256(repr(seed).encode()).digest()[:16], 'big')
+
+
 class RandomSumGenerator:
-    def __init__(self, seed=None, debug=False):
+    def __init__(self, seed=None, debug=False, stats=False, on_sample=None):
         self.debug = debug
-        if seed is not None:
-            random.seed(seed)
-            if self.debug:
-                logger.debug(f"Seed set to: {seed}")
+        self.seed = seed
+        self.stats = GenerationStats() if stats else None
+        self.on_sample = on_sample
+        self.last_method = None
+        self._init_streams(_entropy(seed), ())
+        if seed is not None and self.debug:
+            logger.debug(f"Seed set to: {seed}")
 
-    def _normalize_bounds(self, val, parts, default):
-        if isinstance(val, list):
-            if len(val) != parts:
-                raise ValueError(f"List length of bounds must match parts. Got {len(val)} for {parts} parts.")
-            return val
+    def _init_streams(self, entropy, spawn_key):
+        self._entropy = entropy
+        self._spawn_key = spawn_key
+        self._n_children = 0
+        self._np_rng = None
+        self._coalescer = None
+        if spawn_key:
+            digest = hashlib.sha256(repr((entropy, spawn_key)).encode()).digest()
+            self._rng = random.Random(int.from_bytes(digest, 'big'))
         else:
-            return [val] * parts
+            self._rng = random.Random(entropy)
+
+    def _numpy_rng(self):
+        if self._np_rng is None:
+            import numpy as np
+            self._np_rng = np.random.default_rng(np.random.SeedSequence(self._entropy, spawn_key=self._spawn_key))
+        return self._np_rng
+
+    def spawn(self, n):
+        # Children get independent, reproducible streams keyed by (seed, spawn path),
+        # so each one can be handed to its own thread or process.
+        children = []
+        for i in range(n):
+            child = type(self).__new__(type(self))
+            child.debug = self.debug
+            child.seed = self.seed
+            # Children keep their own counters (merge them with stats.merge) so threads never share one.
+            child.stats = GenerationStats() if self.stats is not None else None
+            child.on_sample = self.on_sample
+            child.last_method = None
+            child._init_streams(self._entropy, self._spawn_key + (self._n_children + i,))
+            children.append(child)
+        self._n_children += n
+        return children
+
+    def compile(self, total, parts, min_val=0, max_val=None, mode='float', precision=2, alpha=1.0):
+        min_val, max_val, alpha = _freeze(min_val), _freeze(max_val), _freeze(alpha)
+        try:
+            return _compile(total, parts, min_val, max_val, mode, precision, alpha)
+        except TypeError:
+            # Unhashable bounds (e.g. NumPy arrays) skip the cache; the spec itself is still hashable.
+            return GenerationSpec(total, parts, min_val, max_val, mode, precision, alpha)
+
+    def _resolve(self, total, parts, min_val, max_val, mode, precision, alpha):
+        if isinstance(total, GenerationSpec):
+            return total
+        return self.compile(total, parts, min_val, max_val, mode, precision, alpha)
+
+    def plan(self, total, parts=None, min_val=0, max_val=None, mode='float', precision=2, alpha=1.0,
+             vectorized=False):
+        # Which engine 'auto' picks for these arguments, with the acceptance estimates behind the choice.
+        # vectorized=True gives the choice for the NumPy batch paths (generate_batch and friends).
+        spec = self._resolve(total, parts, min_val, max_val, mode, precision, alpha)
+        method, acceptance, dp_bytes = _plan(spec, vectorized)
+        costs = VECTOR_COSTS if vectorized else ENGINE_COSTS
+        target = 'uniform' if spec.flat else 'dirichlet'
+        plan = dict(method=method, target=method if method in ('rejection', 'exact') else target,
+                    acceptance=dict(acceptance), cost={m: costs[m] / a for m, a in acceptance.items() if a > 0})
+        if plan['target'] != target:
+            # Neither engine for the requested law is practical (see _plan).
+            plan['fallback'] = True
+        if dp_bytes is not None:
+            plan['dp_table_bytes'] = dp_bytes
+        return plan
 
-    def generate(self, total, parts, min_val=0, max_val=None, mode='float', precision=2, max_attempts=1000):
-        if max_val is None:
-            max_val = total
+    def presolve(self, total, parts=None, min_val=0, max_val=None, mode='float', precision=2):
+        # The per-part intervals every engine samples in, after tightening the given
+        # bounds with the ones the total implies, and which given bounds mattered.
+        from .presolve import report
+        return report(self._resolve(total, parts, min_val, max_val, mode, precision, 1.0))
 
-        min_vals = self._normalize_bounds(min_val, parts, 0)
-        max_vals = self._normalize_bounds(max_val, parts, total)
+    def _choose_method(self, spec, method, vectorized=False):
+        if method not in METHODS:
+            raise ValueError(f"Method must be one of {METHODS}")
 
-        # 🧠 Feasibility Check
-        if sum(min_vals) > total:
-            raise ValueError("Sum of min_vals is too high for the given total.")
-        if sum(max_vals) < total:
-            raise ValueError("Sum of max_vals is too low to reach the total.")
+        if method == 'auto':
+            method = _plan(spec, vectorized)[0]
+            if self.debug:
+                logger.debug(f"Auto-selected method: {method}")
+        elif method in ('exact', 'dp') and not spec.flat:
+            raise ValueError(f"method={method!r} does not support alpha; "
+                             f"use 'dirichlet' or 'rejection'.")
+        elif method == 'rejection' and spec.tight_upper:
+            avg = spec.total / spec.parts
+            raise ValueError(
+                f"max_val too tight to generate varied values. Try setting max_val > total/parts = {avg:.2f}"
+            )
+        self.last_method = method
+        return method
+
+    def generate(self, total, parts=None, min_val=0, max_val=None, mode='float', precision=2, max_attempts=1000,
+                 method='auto', out=None, alpha=1.0):
+        spec = self._resolve(total, parts, min_val, max_val, mode, precision, alpha)
+        method = self._choose_method(spec, method)
+
+        if out is not None:
+            from . import batch
+            if method in ('exact', 'dp'):
+                # Sequential engines: the pure-Python walk costs a few operations per
+                # part, where a one-row batch kernel would make several NumPy calls.
+                batch.check_out(out, (spec.parts,), spec)
+                batch.write_units(out, self._walk(spec, method), spec)
+            else:
+                batch.generate_into(self._numpy_rng(), spec, out, max_attempts, method, self.stats)
+            if self.debug:
+                logger.debug(f"[{method}] Wrote {spec.parts} parts into out")
+            return self._emit(out, method)
+
+        return self._emit(self._sample_one(spec, method, max_attempts), method)
 
-        avg = total / parts
-        if all(isinstance(x, (int, float)) for x in max_vals):
-            tight_upper = all(round(m, 5) <= round(avg, 5) for m in max_vals)
-            if tight_upper:
-                raise ValueError(
-                    f"max_val too tight to generate varied values. Try setting max_val > total/parts = {avg:.2f}"
-                )
+    def _sample_one(self, spec, method, max_attempts):
+        # One sample from the pure-Python engines; also the 'pure' backend's engine.
+        stats = self.stats
+        if method in ('exact', 'dp'):
+            result = spec.from_units(self._walk(spec, method))
+            if self.debug:
+                logger.debug(f"[{method}] Result: {result}")
+            return result
 
+        draw = DRAWS[method]
         for attempt in range(max_attempts):
-            raw = [random.gammavariate(1, 1) for _ in range(parts)]
-            total_raw = sum(raw)
-            proportions = [r / total_raw for r in raw]
-            scaled = [min_vals[i] + proportions[i] * (max_vals[i] - min_vals[i]) for i in range(parts)]
-
-            if mode == 'int':
-                scaled_total = sum(scaled)
-                adjusted = [int(round(s * total / scaled_total)) for s in scaled]
-                diff = total - sum(adjusted)
-                adjusted[-1] += diff
-                if all(min_vals[i] <= adjusted[i] <= max_vals[i] for i in range(parts)):
-                    if self.debug:
-                        logger.debug(f"[Attempt {attempt}] Result: {adjusted}")
-                    return adjusted
-
-            elif mode == 'float':
-                scaled_total = sum(scaled)
-                adjusted = [round(s * total / scaled_total, precision) for s in scaled]
-                diff = round(total - sum(adjusted), precision)
-                adjusted[-1] = round(adjusted[-1] + diff, precision)
-                if all(min_vals[i] <= adjusted[i] <= max_vals[i] for i in range(parts)):
-                    if self.debug:
-                        logger.debug(f"[Attempt {attempt}] Result: {adjusted}")
-                    return adjusted
+            if stats is None:
+                adjusted = draw(self._rng, spec)
+                accepted = _within(adjusted, spec)
+            else:
+                adjusted, accepted = stats.measure_attempt(draw, _within, self._rng, spec)
+            if accepted:
+                result = spec.from_units(adjusted)
+                if stats is not None:
+                    stats.record_call(method, 1, attempt + 1)
+                if self.debug:
+                    logger.debug(f"[Attempt {attempt}] Result: {result}")
+                return result
+
+        if stats is not None:
+            stats.record_failure(method, max_attempts)
+        raise RuntimeError(f"Failed to generate valid output in {max_attempts} attempts.")
+
+    def _walk(self, spec, method):
+        # Grid units of one 'exact' or 'dp' sample; these engines never reject.
+        units = (sample_dp if method == 'dp' else sample_exact)(self._rng, spec)
+        if self.stats is not None:
+            self.stats.record_call(method, 1, 1)
+        return units
+
+    def _emit(self, result, method):
+        if self.on_sample is not None:
+            self.on_sample(result, method)
+        return result
+
+    def generate_batch(self, n_samples, total, parts=None, min_val=0, max_val=None, mode='float', precision=2,
+                       max_attempts=1000, method='auto', out=None, alpha=1.0, backend='numpy'):
+        # backend: 'numpy' (an array), 'pure' (a list of rows, no NumPy needed) or
+        # 'auto', which picks by n_samples * parts; see backends.CROSSOVER_VALUES.
+        spec = self._resolve(total, parts, min_val, max_val, mode, precision, alpha)
 
+        from .backends import choose
+
+        engine = choose(backend, n_samples, spec)
+        method = self._choose_method(spec, method, vectorized=engine.name == 'numpy')
+        if out is not None:
+            # Checked before sampling, and filled in place on NumPy: peak memory is `out` alone.
+            from . import batch
+            batch.check_out(out, (n_samples, spec.parts), spec)
+            if engine.name == 'numpy':
+                result = batch.sample_into(self._numpy_rng(), out, spec, max_attempts, method, self.stats)
             else:
-                raise ValueError("Mode must be 'int' or 'float'")
+                out[...] = engine.sample(self, n_samples, spec, max_attempts, method)
+                result = out
+        else:
+            result = engine.sample(self, n_samples, spec, max_attempts, method)
+        if self.debug:
+            logger.debug(f"Generated batch of {n_samples} x {spec.parts} on the {engine.name!r} backend")
+        return self._emit(result, method)
+
+    def generate_many(self, n_samples, total, parts=None, min_val=0, max_val=None, mode='float', precision=2,
+                      max_attempts=1000, method='auto', workers=None, shard_size=None, alpha=1.0, executor=None):
+        spec = self._resolve(total, parts, min_val, max_val, mode, precision, alpha)
+        method = self._choose_method(spec, method, vectorized=True)
+
+        from .parallel import generate_sharded, SHARD_SIZE
+
+        # One draw from this generator's stream seeds every shard of the call, so the
+        # output depends on the seed and shard_size but never on the worker count.
+        base_seed = int(self._numpy_rng().integers(2 ** 63))
+        result = generate_sharded(base_seed, n_samples, spec, max_attempts, method, workers,
+                                  shard_size or SHARD_SIZE, self.stats, executor)
+        if self.debug:
+            logger.debug(f"Generated {n_samples} samples across {workers or 'all'} workers")
+        return self._emit(result, method)
+
+    def generate_table(self, row_sums, col_sums, min_cell=0, max_cell=None, mode='float', precision=2,
+                       sweeps=None):
+        # Random non-negative table with fixed row and column sums; min_cell/max_cell
+        # are scalars or (rows, cols) arrays.
+        from .table import sample_table, SWEEPS
+
+        if mode not in ('int', 'float', 'decimal'):
+            raise ValueError("Mode must be 'int', 'float' or 'decimal'")
+        result = sample_table(self._numpy_rng(), row_sums, col_sums, min_cell, max_cell, mode, precision,
+                              SWEEPS if sweeps is None else sweeps)
+        if self.debug:
+            logger.debug(f"Generated table of shape {result.shape}")
+        return self._emit(result, 'table')
+
+    def compile_rows(self, totals, parts=None, min_val=0, max_val=None, mode='float', precision=2):
+        from .rows import RowsSpec
+        return RowsSpec(totals, parts, min_val, max_val, mode, precision)
+
+    def generate_rows(self, totals, parts=None, min_val=0, max_val=None, mode='float', precision=2,
+                      max_attempts=1000, method='exact'):
+        # A different split per row: row i divides totals[i] within its own bounds
+        # (min_val/max_val are scalars, length-parts or (rows, parts)). Returns
+        # (values, feasible); rows without any valid split are all zero and flagged
+        # False in `feasible` instead of raising.
+        from .rows import RowsSpec, sample_rows
+        from .batch import to_output
+
+        if method not in ('auto', 'exact', 'rejection', 'dirichlet'):
+            raise ValueError("method must be 'auto', 'exact', 'rejection' or 'dirichlet' for generate_rows.")
+        # The default 'exact' never rejects, so no row can run out of attempts. 'auto'
+        # means generate()'s law, the uniform split within each row's bounds.
+        method = 'dirichlet' if method == 'auto' else method
+        spec = totals if isinstance(totals, RowsSpec) else RowsSpec(totals, parts, min_val, max_val, mode,
+                                                                    precision)
+        values = to_output(sample_rows(self._numpy_rng(), spec, max_attempts, method, self.stats), spec.scale,
+                           spec.mode, spec.precision)
+        self.last_method = method
+        if self.debug:
+            logger.debug(f"Generated {spec.size} rows, {int((~spec.feasible).sum())} infeasible")
+        return self._emit(values, method), spec.feasible
+
+    def allocate(self, df, group_col, total_col, min_col=None, max_col=None, mode='float', precision=2,
+                 max_attempts=1000, method='exact', errors='raise', name=None):
+        # Splits each group's total (repeated on its rows in total_col) across the
+        # group's rows, within optional per-row min/max columns. df is a pandas
+        # DataFrame, a pyarrow Table or a dict of arrays; the result is a new column
+        # of the same kind, aligned with df's rows. errors='coerce' leaves groups
+        # without a valid split missing instead of raising.
+        from .frame import allocate
+
+        if method not in ('auto', 'exact', 'rejection', 'dirichlet'):
+            raise ValueError("method must be 'auto', 'exact', 'rejection' or 'dirichlet' for allocate.")
+        # As in generate_rows: 'auto' is the uniform split, the default 'exact' never rejects.
+        method = 'dirichlet' if method == 'auto' else method
+        result = allocate(self._numpy_rng(), df, group_col, total_col, min_col, max_col, mode, precision,
+                          max_attempts, method, errors, name, self.stats)
+        self.last_method = method
+        return self._emit(result, method)
+
+    def compile_tree(self, tree, mode='float', precision=2):
+        from .hierarchy import TreeSpec
+        return TreeSpec(tree, mode, precision)
+
+    def generate_tree(self, tree, n_samples=None, mode='float', precision=2):
+        # tree: nested dicts with 'total' (root, or any fixed node), 'min', 'max',
+        # 'children' and an optional 'name'. Returns (values, offsets): level d is
+        # values[..., offsets[d]:offsets[d + 1]].
+        from .hierarchy import TreeSpec, sample_tree
+        from .batch import to_output
+
+        spec = tree if isinstance(tree, TreeSpec) else TreeSpec(tree, mode, precision)
+        n = 1 if n_samples is None else n_samples
+        values = to_output(sample_tree(self._numpy_rng(), n, spec), spec.scale, spec.mode, spec.precision)
+        if n_samples is None:
+            values = values[0]
+        if self.debug:
+            logger.debug(f"Generated {n} tree samples over {spec.size} nodes")
+        return self._emit(values, 'tree'), spec.offsets
+
+    def polytope(self, total, parts, min_val=0, max_val=None, A_ub=None, b_ub=None, A_eq=None, b_eq=None,
+                 burn_in=None, thin=None, precision=None):
+        # Uniform samples under extra linear constraints (A_ub x <= b_ub, A_eq x = b_eq)
+        # from a hit-and-run chain that draws on this generator's stream.
+        from .polytope import PolytopeSampler
+        return PolytopeSampler(self, total, parts, min_val, max_val, A_ub, b_ub, A_eq, b_eq, burn_in, thin,
+                               precision)
+
+    async def agenerate(self, total, parts=None, min_val=0, max_val=None, mode='float', precision=2,
+                        max_attempts=1000, method='auto', alpha=1.0, window=None, executor=None):
+        # Same result as generate(), computed off the event loop. Concurrent calls with
+        # the same spec are coalesced into one generate_batch, so which row a caller
+        # gets depends on arrival order even with a fixed seed.
+        import asyncio
+        from .aio import Coalescer, WINDOW
+
+        spec = self._resolve(total, parts, min_val, max_val, mode, precision, alpha)
+        method = self._choose_method(spec, method)
+        loop = asyncio.get_running_loop()
+        if self._coalescer is None or self._coalescer.loop is not loop:
+            self._coalescer = Coalescer(self, loop)
+        return await self._coalescer.submit((spec, method, max_attempts),
+                                            WINDOW if window is None else window, executor)
+
+    def generate_range(self, start, stop, total, parts=None, min_val=0, max_val=None, mode='float', precision=2,
+                       max_attempts=1000, method='auto', alpha=1.0):
+        # Counter-based rows: row i depends only on (seed, spec, i), never on the
+        # generator's state or on other rows, so any node can produce any slice.
+        spec = self._resolve(total, parts, min_val, max_val, mode, precision, alpha)
+        method = self._choose_method(spec, method, vectorized=True)
+        if not spec.flat:
+            raise ValueError("generate_range/generate_at support only alpha=1.")
+        if not 0 <= start <= stop:
+            raise ValueError(f"Need 0 <= start <= stop, got start={start}, stop={stop}.")
+
+        from .counter import sample_range, stream_key
+
+        key = stream_key(self._entropy, self._spawn_key, spec)
+        return self._emit(sample_range(key, start, stop, spec, max_attempts, method), method)
+
+    def generate_at(self, index, total, parts=None, min_val=0, max_val=None, mode='float', precision=2,
+                    max_attempts=1000, method='auto', alpha=1.0):
+        return self.generate_range(index, index + 1, total, parts, min_val, max_val, mode, precision, max_attempts,
+                                   method, alpha)[0].tolist()
+
+    def generate_qmc(self, n_samples, total, parts=None, min_val=0, max_val=None, mode='float', precision=2,
+                     sequence='halton', skip=0, max_attempts=1000):
+        # Quasi-random rows for lower-variance Monte Carlo estimates, uniform within the
+        # bounds like generate(). Rows skip..skip+n of the same (seed, spec) stream, so
+        # consecutive calls can continue it.
+        if skip < 0:
+            raise ValueError("skip must be non-negative.")
+        if skip and sequence == 'lhs':
+            raise ValueError("sequence='lhs' has no fixed order to skip into; use skip=0 or 'halton'/'sobol'.")
+        spec = self._resolve(total, parts, min_val, max_val, mode, precision, 1.0)
+
+        from .batch import to_output
+        from .qmc import sample_qmc
+
+        units = sample_qmc(self._numpy_rng(), self._entropy, self._spawn_key, n_samples, spec, sequence, skip,
+                           max_attempts)
+        self.last_method = 'dirichlet'
+        return self._emit(to_output(units, spec.units()[0], spec.mode, spec.precision), 'dirichlet')
+
+    def generate_file(self, target, n_samples, total, parts=None, min_val=0, max_val=None, mode='float',
+                      precision=2, max_attempts=1000, method='auto', alpha=1.0, chunk_size=65536, resume=True):
+        # Out-of-core generation, one chunk of rows in memory at a time. `target` is a
+        # path (raw file with a header, resumed from its last completed chunk) or an
+        # array to fill, such as a np.memmap. Read files back with rawfile.load.
+        spec = self._resolve(total, parts, min_val, max_val, mode, precision, alpha)
+        method = self._choose_method(spec, method, vectorized=True)
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1.")
+
+        from . import rawfile
+
+        entropy, spawn_key = self._entropy, self._spawn_key
+        if self.seed is None and resume and not hasattr(target, 'shape') and os.path.exists(target):
+            # An unseeded generator draws fresh entropy every run; resuming continues
+            # the streams the file was started with.
+            seed = rawfile.read_header(os.fspath(target))['seed']
+            entropy, spawn_key = seed['entropy'], tuple(seed['spawn_key'])
+        header = rawfile.make_header(spec, method, entropy, spawn_key, n_samples, chunk_size)
+        if hasattr(target, 'shape'):
+            result = rawfile.fill(target, header, spec, max_attempts, self.stats)
+        else:
+            result = rawfile.write(os.fspath(target), header, spec, max_attempts, self.stats, resume)
+        if self.debug:
+            logger.debug(f"Wrote {n_samples} samples to {target if not hasattr(target, 'shape') else 'array'}")
+        return self._emit(result, method)
+
+    def iter_generate(self, total, parts=None, min_val=0, max_val=None, mode='float', precision=2,
+                      max_attempts=1000, method='auto', chunk_size=4096, limit=None, alpha=1.0, backend='auto'):
+        # Validation runs here, once, rather than lazily on the first next().
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1.")
+        spec = self._resolve(total, parts, min_val, max_val, mode, precision, alpha)
+
+        from .backends import choose
+
+        # The whole stream decides, not one chunk: a long or endless stream of small
+        # chunks pays NumPy's fixed costs back many times over.
+        engine = choose(backend, float('inf') if limit is None else limit, spec)
+        method = self._choose_method(spec, method, vectorized=engine.name == 'numpy')
+
+        def chunks():
+            produced = 0
+            while limit is None or produced < limit:
+                n = chunk_size if limit is None else min(chunk_size, limit - produced)
+                yield engine.rows(self._emit(engine.sample(self, n, spec, max_attempts, method), method))
+                produced += n
 
-        raise RuntimeError(f"Failed to generate valid output in {max_attempts} attempts.")
\ No newline at end of file
+        return (row for chunk in chunks() for row in chunk)
@@ -0,0 +1,105 @@
+import hashlib
+import random
+
+import numpy as np
+
+from .batch import propose, sample_exact_rows, to_output
+from .compositions import sample_dp
+
+MASK = np.uint64(0xFFFFFFFF)
+PHILOX_M = (np.uint64(0xD2511F53), np.uint64(0xCD9E8D57))
+PHILOX_W = (np.uint64(0x9E3779B9), np.uint64(0xBB67AE85))
+
+
+def philox4x32(counter, key, rounds=10):
+    # Philox4x32-10 (Salmon et al., "Parallel random numbers: as easy as 1, 2, 3"),
+    # vectorized over counters. counter: four arrays of 32-bit words; key: two words.
+    c0, c1, c2, c3 = (np.asarray(c, dtype=np.uint64) for c in counter)
+    k0, k1 = (np.uint64(k) for k in key)
+    for _ in range(rounds):
+        p0 = PHILOX_M[0] * c0
+        p1 = PHILOX_M[1] * c2
+        c0, c1, c2, c3 = (p1 >> np.uint64(32)) ^ c1 ^ k0, p1 & MASK, (p0 >> np.uint64(32)) ^ c3 ^ k1, p0 & MASK
+        k0 = (k0 + PHILOX_W[0]) & MASK
+        k1 = (k1 + PHILOX_W[1]) & MASK
+    return c0, c1, c2, c3
+
+
+def stream_key(entropy, spawn_key, spec):
+    digest = hashlib.sha256(repr((entropy, spawn_key, spec.digest())).encode()).digest()
+    return int.from_bytes(digest[:4], 'little'), int.from_bytes(digest[4:8], 'little')
+
+
+def uniforms(key, indices, attempt, count):
+    # (len(indices), count) doubles in [0, 1). Counter words: (block, attempt, index
+    # low, index high), so every draw depends only on (key, index, attempt, position).
+    indices = np.asarray(indices, dtype=np.uint64)
+    blocks = np.arange((count + 1) // 2, dtype=np.uint64)
+    shape = (indices.size, blocks.size)
+    words = philox4x32((np.broadcast_to(blocks, shape), np.full(shape, attempt, dtype=np.uint64),
+                        np.broadcast_to((indices & MASK)[:, None], shape),
+                        np.broadcast_to((indices >> np.uint64(32))[:, None], shape)), key)
+    # Two 53-bit doubles per block, built like numpy's random_double.
+    a, b = (words[0] >> np.uint64(5), words[2] >> np.uint64(5)), (words[1] >> np.uint64(6), words[3] >> np.uint64(6))
+    doubles = np.stack([(a[i] * 67108864 + b[i]) / 9007199254740992.0 for i in range(2)], axis=2)
+    return doubles.reshape(indices.size, -1)[:, :count]
+
+
+def _compose(u, remaining):
+    # Uniform compositions of `remaining` into u.shape[1] parts, as batch.compose,
+    # from fixed uniforms: Floyd's algorithm picks parts - 1 distinct cut points out
+    # of remaining + parts - 1 slots with one uniform each.
+    rows, cut_count = u.shape[0], u.shape[1] - 1
+    slots = remaining + cut_count
+    cuts = np.empty((rows, cut_count + 2), dtype=np.int64)
+    cuts[:, 0], cuts[:, -1] = -1, slots
+    for step, j in enumerate(range(slots - cut_count, slots)):
+        t = np.minimum((u[:, step] * (j + 1)).astype(np.int64), j)
+        taken = (cuts[:, 1:step + 1] == t[:, None]).any(axis=1)
+        cuts[:, step + 1] = np.where(taken, j, t)
+    cuts.sort(axis=1)
+    return np.diff(cuts, axis=1) - 1
+
+
+def sample_range(key, start, stop, spec, max_attempts, method):
+    indices = np.arange(start, stop, dtype=np.uint64)
+    n, parts = indices.size, spec.parts
+    scale, units_total, lo, caps = spec.unit_arrays()
+
+    if method == 'exact':
+        shape = (n, parts)
+        units = sample_exact_rows(None, np.full(n, units_total, dtype=np.int64), np.broadcast_to(lo, shape),
+                                  np.broadcast_to(caps, shape), uniforms=uniforms(key, indices, 0, 2 * parts - 1))
+    elif method == 'dp':
+        # The DP walk draws a variable number of integers; each row gets its own
+        # random.Random seeded from its counter.
+        seeds = uniforms(key, indices, 0, 2)
+        rows = [sample_dp(random.Random(int(s[0] * 2 ** 53) << 53 | int(s[1] * 2 ** 53)), spec) for s in seeds]
+        units = np.array(rows, dtype=np.int64).reshape(n, parts)
+    else:
+        units = sample_indices(key, indices, spec, max_attempts, method)
+    return to_output(units, scale, spec.mode, spec.precision)
+
+
+def sample_indices(key, indices, spec, max_attempts, method):
+    # Grid units of rows `indices` from a rejection engine. Attempt a of row i always
+    # uses counter (i, a), so a row's result doesn't depend on which other rows
+    # share its call.
+    n, parts = indices.size, spec.parts
+    _, units_total, lo, caps = spec.unit_arrays()
+    out = np.empty((n, parts), dtype=np.int64)
+    pending = np.arange(n)
+    for attempt in range(max_attempts):
+        if pending.size == 0:
+            break
+        if method == 'dirichlet' and spec.flat:
+            adjusted = _compose(uniforms(key, indices[pending], attempt, parts), units_total - int(lo.sum())) + lo
+        else:
+            adjusted = propose(-np.log1p(-uniforms(key, indices[pending], attempt, parts)), spec, method)
+        shifted = adjusted - lo
+        ok = ((shifted >= 0) & (shifted <= caps)).all(axis=1)
+        out[pending[ok]] = adjusted[ok]
+        pending = pending[~ok]
+    if pending.size:
+        raise RuntimeError(f"Failed to generate valid output for {pending.size} rows in {max_attempts} attempts.")
+    return out
@@ -0,0 +1,42 @@
+import math
+
+
+def truncated_beta1(u, m, lo, hi):
+    # Inverse CDF of Beta(1, m) restricted to [lo, hi]. One coordinate of a uniform
+    # point on a simplex with m + 1 parts follows Beta(1, m).
+    f_lo = 1 - (1 - lo) ** m
+    f_hi = 1 - (1 - hi) ** m
+    v = f_lo + u * (f_hi - f_lo)
+    return 1 - (1 - v) ** (1 / m)
+
+
+def sample_exact(rng, spec):
+    _, units_total, lo, caps = spec.units()
+    parts = len(lo)
+    remaining = units_total - sum(lo)
+    cap_after = sum(caps)
+
+    # Sequential construction: each part is drawn from the interval that still
+    # leaves the remaining parts feasible, so nothing is ever rejected. The draw
+    # inside that interval is the unbounded Beta(1, m) marginal, which ignores how
+    # many completions each value leaves, so this is only uniform when no upper
+    # bound binds; binding caps shift mass toward the loose parts. Visiting parts
+    # in random order keeps any single position from being favoured.
+    order = list(range(parts))
+    rng.shuffle(order)
+    values = list(lo)
+    for k, i in enumerate(order[:-1]):
+        cap_after -= caps[i]
+        a = max(0, remaining - cap_after)
+        b = min(caps[i], remaining)
+        if a < b:
+            span = remaining + 1
+            y = math.floor(truncated_beta1(rng.random(), parts - k - 1, a / span, (b + 1) / span) * span)
+            y = min(max(y, a), b)
+        else:
+            y = a
+        values[i] += y
+        remaining -= y
+    values[order[-1]] += remaining
+
+    return values
@@ -0,0 +1,85 @@
+import numpy as np
+
+from .batch import to_output
+from .rows import RowsSpec, sample_rows
+
+
+def _is_arrow(df):
+    return hasattr(df, 'column_names') and hasattr(df, 'schema')
+
+
+def _column(df, name):
+    if name is None:
+        return None
+    if _is_arrow(df):
+        return df.column(name).to_numpy()
+    column = df[name]
+    return column.to_numpy() if hasattr(column, 'to_numpy') else np.asarray(column)
+
+
+def _codes(df, name):
+    # Integer group codes plus their labels; pandas factorizes without sorting labels.
+    column = df.column(name) if _is_arrow(df) else df[name]
+    if hasattr(column, 'factorize'):
+        codes, labels = column.factorize(use_na_sentinel=False)
+        return np.asarray(codes), np.asarray(labels)
+    labels, codes = np.unique(_column(df, name), return_inverse=True)
+    return codes.ravel(), labels
+
+
+def _wrap(df, values, name):
+    # The new column in the frame's own type: a pandas Series on the frame's index,
+    # a pyarrow Array, or a plain array for a dict of arrays.
+    if _is_arrow(df):
+        import pyarrow as pa
+        return pa.array(values)
+    if hasattr(df, 'index') and hasattr(df, 'columns'):
+        import pandas as pd
+        return pd.Series(values, index=df.index, name=name)
+    return values
+
+
+def allocate(rng, df, group_col, total_col, min_col=None, max_col=None, mode='float', precision=2,
+             max_attempts=1000, method='exact', errors='raise', name=None, stats=None):
+    if errors not in ('raise', 'coerce'):
+        raise ValueError("errors must be 'raise' or 'coerce'.")
+    codes, labels = _codes(df, group_col)
+    if codes.size == 0:
+        return _wrap(df, np.empty(0), name)
+    totals = np.asarray(_column(df, total_col), dtype=float)
+    lo = _column(df, min_col)
+    hi = _column(df, max_col)
+
+    # Rows sorted by group: group g owns sorted rows starts[g] .. starts[g] + sizes[g].
+    order = np.argsort(codes, kind='stable')
+    starts = np.flatnonzero(np.r_[True, np.diff(codes[order]) != 0])
+    sizes = np.diff(np.r_[starts, order.size])
+    sorted_totals = totals[order]
+    group_totals = sorted_totals[starts]
+    spread = np.maximum.reduceat(sorted_totals, starts) - np.minimum.reduceat(sorted_totals, starts)
+    if spread.any():
+        raise ValueError(f"{total_col!r} must hold the same group total on every row of a group.")
+
+    units = np.zeros(order.size, dtype=np.int64)
+    feasible = np.ones(starts.size, dtype=bool)
+    # Groups of equal size stack into one (groups, size) batch without padding, so
+    # there is one vectorized pass per distinct group size, never one per group.
+    for size in np.unique(sizes).tolist():
+        members = (sizes == size).nonzero()[0]
+        rows = order[starts[members, None] + np.arange(size)]
+        spec = RowsSpec(group_totals[members], size, 0 if lo is None else lo[rows],
+                        None if hi is None else hi[rows], mode, precision)
+        units[rows] = sample_rows(rng, spec, max_attempts, method, stats)
+        feasible[members] = spec.feasible
+
+    values = to_output(units, 1 if mode == 'int' else 10 ** precision, mode, precision)
+    if not feasible.all():
+        bad = labels[codes[order[starts[~feasible]]]]
+        if errors == 'raise':
+            shown = ', '.join(map(repr, bad[:5].tolist())) + (', ...' if bad.size > 5 else '')
+            raise ValueError(f"No valid split for {bad.size} group(s): {shown}.")
+        # 'coerce': every row of an infeasible group becomes missing.
+        values = values.astype(object if mode == 'decimal' else float)
+        values[~feasible[np.repeat(np.arange(starts.size), sizes)][np.argsort(order)]] = \
+            None if mode == 'decimal' else np.nan
+    return _wrap(df, values, name)
@@ -0,0 +1,120 @@
+import math
+
+import numpy as np
+
+from .batch import sample_exact_rows, to_output
+from .spec import MODES
+
+
+class TreeSpec:
+    # A nested split compiled into flat, level-ordered arrays. Node 0 is the root;
+    # the nodes of level d are values[offsets[d]:offsets[d + 1]], and siblings are
+    # contiguous, so every level is sampled as one padded batch of splits.
+    def __init__(self, tree, mode='float', precision=2):
+        if mode not in MODES:
+            raise ValueError("Mode must be 'int', 'float' or 'decimal'")
+        if 'total' not in tree:
+            raise ValueError("The root of the tree needs a 'total'.")
+        self.mode = mode
+        self.precision = precision
+        self.scale = 1 if mode == 'int' else 10 ** precision
+
+        nodes, parents, offsets = [tree], [-1], [0]
+        level = [0]
+        while level:
+            offsets.append(len(nodes))
+            nxt = []
+            for p in level:
+                for child in nodes[p].get('children', ()):
+                    nxt.append(len(nodes))
+                    nodes.append(child)
+                    parents.append(p)
+            level = nxt
+        self.size = len(nodes)
+        self.parents = np.array(parents)
+        self.offsets = np.array(offsets)
+        self.names = [node.get('name') for node in nodes]
+
+        total = tree['total']
+        lo = [node.get('total', node.get('min', 0)) for node in nodes]
+        hi = [node.get('total', node.get('max', total)) for node in nodes]
+        self.lo = np.array([math.ceil(round(v * self.scale, 6)) for v in lo], dtype=np.int64)
+        self.hi = np.array([math.floor(round(v * self.scale, 6)) for v in hi], dtype=np.int64)
+        self._propagate()
+        self._groups = [self._group(d) for d in range(1, len(self.offsets) - 1)]
+
+    def _infeasible(self, nodes):
+        i = int(nodes[0])
+        name = self.names[i] if self.names[i] is not None else f"node {i}"
+        return ValueError(f"Bounds leave no feasible values for {name} at precision "
+                          f"{0 if self.mode == 'int' else self.precision}.")
+
+    def _child_sums(self, d, values):
+        start, stop = self.offsets[d], self.offsets[d + 1]
+        sums = np.zeros(self.size, dtype=np.int64)
+        np.add.at(sums, self.parents[start:stop], values[start:stop])
+        return sums
+
+    def _propagate(self):
+        # Bottom-up, a node can only take values its children can add up to; top-down,
+        # a child must leave its siblings room to reach the parent. One pass each way
+        # makes every interval exact: each value in it extends to a full assignment.
+        depth = len(self.offsets) - 1
+        has_children = np.zeros(self.size, dtype=bool)
+        has_children[self.parents[1:]] = True
+        for d in range(depth - 1, 0, -1):
+            parents = slice(self.offsets[d - 1], self.offsets[d])
+            mask = has_children[parents]
+            self.lo[parents] = np.where(mask, np.maximum(self.lo[parents], self._child_sums(d, self.lo)[parents]),
+                                        self.lo[parents])
+            self.hi[parents] = np.where(mask, np.minimum(self.hi[parents], self._child_sums(d, self.hi)[parents]),
+                                        self.hi[parents])
+        bad = (self.lo > self.hi).nonzero()[0]
+        if bad.size:
+            raise self._infeasible(bad)
+
+        for d in range(1, depth):
+            start, stop = self.offsets[d], self.offsets[d + 1]
+            parent = self.parents[start:stop]
+            lo, hi = self.lo[start:stop], self.hi[start:stop]
+            sum_lo, sum_hi = self._child_sums(d, self.lo)[parent], self._child_sums(d, self.hi)[parent]
+            self.lo[start:stop] = np.maximum(lo, self.lo[parent] - (sum_hi - hi))
+            self.hi[start:stop] = np.minimum(hi, self.hi[parent] - (sum_lo - lo))
+            bad = (self.lo[start:stop] > self.hi[start:stop]).nonzero()[0]
+            if bad.size:
+                raise self._infeasible(bad + start)
+
+    def _group(self, d):
+        # Children of level d - 1 as a (parents, widest family) index matrix, -1 padded.
+        start, stop = self.offsets[d], self.offsets[d + 1]
+        parent = self.parents[start:stop]
+        families, first, sizes = np.unique(parent, return_index=True, return_counts=True)
+        members = np.full((families.size, sizes.max()), -1)
+        members[np.repeat(np.arange(families.size), sizes), np.arange(stop - start) - np.repeat(first, sizes)] = \
+            np.arange(start, stop)
+        real = members >= 0
+        lo = np.where(real, self.lo[members], 0)
+        caps = np.where(real, self.hi[members] - self.lo[members], 0)
+        return families, members, real, sizes, lo, caps
+
+    def intervals(self):
+        # Feasible [min, max] of every node after propagation, in output units.
+        return tuple(to_output(v, self.scale, self.mode, self.precision) for v in (self.lo, self.hi))
+
+    def __repr__(self):
+        return f"TreeSpec(nodes={self.size}, levels={len(self.offsets) - 1}, mode={self.mode!r})"
+
+
+def sample_tree(rng, n_samples, spec):
+    values = np.empty((n_samples, spec.size), dtype=np.int64)
+    values[:, 0] = spec.lo[0]
+    # Level by level, every family of every sample is one row of a padded batch,
+    # split exactly (no rejection) within the propagated intervals.
+    for families, members, real, sizes, lo, caps in spec._groups:
+        shape = (n_samples,) + members.shape
+        split = sample_exact_rows(rng, values[:, families].reshape(-1),
+                                  np.broadcast_to(lo, shape).reshape(-1, members.shape[1]),
+                                  np.broadcast_to(caps, shape).reshape(-1, members.shape[1]),
+                                  np.tile(sizes, n_samples)).reshape(shape)
+        values[:, members[real]] = split[:, real]
+    return values
@@ -0,0 +1,57 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .batch import sample_units, to_output
+from .stats import GenerationStats
+
+SHARD_SIZE = 65536
+
+
+def _fill_shard(shm_name, shape, dtype, start, stop, seed, spec, max_attempts, method, collect_stats):
+    stats = GenerationStats() if collect_stats else None
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        out = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        rng = np.random.default_rng(seed)
+        out[start:stop] = sample_units(rng, stop - start, spec, max_attempts, method, stats)
+        del out
+    finally:
+        shm.close()
+    return stats
+
+
+def generate_sharded(base_seed, n_samples, spec, max_attempts, method, workers=None, shard_size=SHARD_SIZE,
+                     stats=None, executor=None):
+    if shard_size < 1:
+        raise ValueError("shard_size must be at least 1.")
+    workers = workers or os.cpu_count() or 1
+    dtype = np.dtype(np.int64)
+    shape = (n_samples, spec.parts)
+
+    bounds = [(start, min(start + shard_size, n_samples)) for start in range(0, n_samples, shard_size)]
+    seeds = np.random.SeedSequence(base_seed).spawn(len(bounds))
+
+    # Workers write unit-grid values straight into a shared buffer; only shard
+    # coordinates and seeds are pickled.
+    shm = shared_memory.SharedMemory(create=True, size=max(1, n_samples * spec.parts * dtype.itemsize))
+    try:
+        jobs = [(shm.name, shape, dtype, start, stop, seed, spec, max_attempts, method, stats is not None)
+                for (start, stop), seed in zip(bounds, seeds)]
+        if executor is not None:
+            shard_stats = [future.result() for future in [executor.submit(_fill_shard, *job) for job in jobs]]
+        elif workers == 1 or len(jobs) <= 1:
+            shard_stats = [_fill_shard(*job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+                shard_stats = [future.result() for future in [pool.submit(_fill_shard, *job) for job in jobs]]
+        if stats is not None:
+            for shard in shard_stats:
+                stats.merge(shard)
+        return to_output(np.ndarray(shape, dtype=dtype, buffer=shm.buf).copy(), spec.units()[0], spec.mode,
+                         spec.precision)
+    finally:
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,176 @@
+import numpy as np
+
+# Directions drawn and projected onto the constraints per matrix product.
+BATCH = 256
+
+
+def _rows(A, b, parts, name):
+    if A is None:
+        return np.empty((0, parts)), np.empty(0)
+    A = np.atleast_2d(np.asarray(A, dtype=float))
+    b = np.atleast_1d(np.asarray(b, dtype=float))
+    if A.shape[1] != parts or A.shape[0] != b.size:
+        raise ValueError(f"A_{name} must have shape (k, {parts}) and b_{name} length k. "
+                         f"Got {A.shape} and {b.size}.")
+    return A, b
+
+
+def _center(G, h, max_outer=12, max_inner=50):
+    # Phase-I barrier method: minimize s subject to G z - h <= s. With unit-norm rows
+    # of G, -s is the distance to the nearest facet, so the result is a deep interior
+    # point (close to the Chebyshev center) rather than something on the boundary.
+    m, k = G.shape
+    z = np.zeros(k)
+    s = max(0.0, (G @ z - h).max()) + 1.0
+    A = np.hstack([-G, np.ones((m, 1))])
+    t = 1.0
+    for _ in range(max_outer):
+        for _ in range(max_inner):
+            r = s + h - G @ z
+            grad = -(A / r[:, None]).sum(axis=0)
+            grad[-1] += t
+            H = (A / r[:, None] ** 2).T @ A
+            step = -np.linalg.lstsq(H, grad, rcond=None)[0]
+            if -grad @ step < 1e-10:
+                break
+            # Backtracking that keeps every constraint strictly satisfied.
+            dr = A @ step
+            scale = 1.0
+            if (dr < 0).any():
+                scale = min(1.0, 0.99 * (-r[dr < 0] / dr[dr < 0]).min())
+            f = t * s - np.log(r).sum()
+            while scale > 1e-12:
+                z_new, s_new = z + scale * step[:-1], s + scale * step[-1]
+                r_new = s_new + h - G @ z_new
+                if (r_new > 0).all() and t * s_new - np.log(r_new).sum() <= f + 0.25 * scale * grad @ step:
+                    z, s = z_new, s_new
+                    break
+                scale /= 2
+            else:
+                break
+        if s < 0 and m / t < 0.01 * -s:
+            break
+        t *= 10
+    return z, s
+
+
+class PolytopeSampler:
+    # Hit-and-run over {x : sum(x) = total, A_eq x = b_eq, min <= x <= max, A_ub x <= b_ub}.
+    # The chain lives in coordinates of the equality constraints' null space, where the
+    # sampled set is a full-dimensional polytope {z : G z <= h}. Its state is kept on
+    # the sampler, so later sample() calls continue the same chain without burn-in.
+    def __init__(self, gen, total, parts, min_val=0, max_val=None, A_ub=None, b_ub=None, A_eq=None, b_eq=None,
+                 burn_in=None, thin=None, precision=None):
+        if max_val is None:
+            max_val = total
+        A_ub, b_ub = _rows(A_ub, b_ub, parts, 'ub')
+        A_eq, b_eq = _rows(A_eq, b_eq, parts, 'eq')
+        lo = np.broadcast_to(np.asarray(min_val, dtype=float), (parts,))
+        hi = np.broadcast_to(np.asarray(max_val, dtype=float), (parts,))
+
+        if (lo > hi).any():
+            raise ValueError("min_val must not exceed max_val.")
+        # Parts pinned by min == max are equalities; as inequalities they would leave
+        # the polytope without an interior.
+        eye = np.eye(parts)
+        pinned = lo == hi
+        E = np.vstack([np.ones((1, parts)), A_eq, eye[pinned]])
+        f = np.concatenate([[total], b_eq, lo[pinned]])
+        self.x0 = np.linalg.lstsq(E, f, rcond=None)[0]
+        if not np.allclose(E @ self.x0, f, atol=1e-9 * max(1.0, np.abs(f).max())):
+            raise ValueError("The equality constraints (including the total) are inconsistent.")
+        _, sv, vt = np.linalg.svd(E)
+        rank = int((sv > 1e-10 * sv[0]).sum())
+        self.basis = vt[rank:].T
+
+        upper, lower = np.isfinite(hi) & ~pinned, np.isfinite(lo) & ~pinned
+        G = np.vstack([A_ub, eye[upper], -eye[lower]])
+        h = np.concatenate([b_ub, hi[upper], -lo[lower]])
+        G, h = G @ self.basis, h - G @ self.x0
+        norms = np.linalg.norm(G, axis=1)
+        flat = norms < 1e-12
+        if (h[flat] < -1e-9).any():
+            raise ValueError("Constraints are infeasible.")
+        self.G = G[~flat] / norms[~flat, None]
+        self.h = h[~flat] / norms[~flat]
+
+        dim = self.basis.shape[1]
+        self.gen = gen
+        self.parts = parts
+        self.precision = precision
+        self.burn_in = 20 * dim if burn_in is None else burn_in
+        self.thin = max(1, dim) if thin is None else thin
+        self.steps = 0
+        if dim and self.G.shape[0]:
+            self.z, radius = _center(self.G, self.h)
+            if radius >= 0:
+                raise ValueError("Constraints are infeasible (or leave no interior to sample).")
+        else:
+            self.z = np.zeros(dim)
+            if (self.h < -1e-9).any():
+                raise ValueError("Constraints are infeasible.")
+        self.slack = self.h - self.G @ self.z
+
+    def _walk(self, rng, n_steps, every=None):
+        # Runs n_steps of the chain; with `every`, returns the state after every
+        # `every`-th step.
+        dim = self.z.size
+        kept = []
+        done = 0
+        if dim == 0:
+            return [self.z.copy()] * (n_steps // every if every else 0)
+        while done < n_steps:
+            batch = min(n_steps - done, BATCH)
+            directions = rng.standard_normal((batch, dim))
+            directions /= np.linalg.norm(directions, axis=1, keepdims=True)
+            along = self.G @ directions.T
+            u = rng.random(batch)
+            for i in range(batch):
+                g = along[:, i]
+                with np.errstate(divide='ignore'):
+                    ratio = self.slack / g
+                up, down = ratio[g > 1e-15], ratio[g < -1e-15]
+                if up.size == 0 or down.size == 0:
+                    raise ValueError("The constraints do not bound the polytope; add finite min/max bounds.")
+                low, high = min(down.max(), 0.0), max(up.min(), 0.0)
+                t = low + u[i] * (high - low)
+                self.z += t * directions[i]
+                self.slack -= t * g
+                done += 1
+                if every and done % every == 0:
+                    kept.append(self.z.copy())
+            # Refresh the incrementally updated slacks so rounding error can't build up.
+            self.slack = np.maximum(self.h - self.G @ self.z, 0.0)
+        return kept
+
+    def sample(self, n_samples=None):
+        n = 1 if n_samples is None else n_samples
+        if n == 0:
+            # Nothing to draw: don't burn in or move the chain.
+            return self.gen._emit(np.empty((0, self.parts)), 'polytope')
+        rng = self.gen._numpy_rng()
+        if self.steps == 0 and self.burn_in:
+            self._walk(rng, self.burn_in)
+            self.steps = self.burn_in
+        states = np.array(self._walk(rng, n * self.thin, self.thin)).reshape(n, -1)
+        self.steps += n * self.thin
+        out = self.x0 + states @ self.basis.T
+        if self.precision is not None:
+            out = _round(out, self.precision)
+        result = out[0] if n_samples is None else out
+        return self.gen._emit(result, 'polytope')
+
+    def __repr__(self):
+        return f"PolytopeSampler(parts={self.parts}, dim={self.z.size}, constraints={self.G.shape[0]})"
+
+
+def _round(values, precision):
+    # Largest-remainder rounding per row, as in the batch engines: the total stays
+    # exact and every part moves by less than one step.
+    scale = 10 ** precision
+    scaled = values * scale
+    totals = np.round(scaled.sum(axis=1, keepdims=True))
+    adjusted = np.floor(scaled)
+    rank = np.argsort(np.argsort(adjusted - scaled, axis=1), axis=1)
+    adjusted += rank < totals - adjusted.sum(axis=1, keepdims=True)
+    return adjusted / scale
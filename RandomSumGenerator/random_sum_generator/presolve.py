@@ -0,0 +1,40 @@
+from .spec import Broadcast
+
+
+def implied_bounds(units_total, lo, hi):
+    # With sum(x) = T fixed: x_i >= T - sum(hi_j, j != i) and x_i <= T - sum(lo_j, j != i).
+    if isinstance(lo, Broadcast) and isinstance(hi, Broadcast):
+        rest = lo.parts - 1
+        return (Broadcast(units_total - rest * hi.value, lo.parts),
+                Broadcast(units_total - rest * lo.value, lo.parts))
+    sum_lo, sum_hi = sum(lo), sum(hi)
+    return [units_total - (sum_hi - h) for h in hi], [units_total - (sum_lo - l) for l in lo]
+
+
+def tighten(units_total, lo, hi):
+    # One pass is exact for a box plus one sum: every value of the tightened
+    # interval extends to a full feasible split, so no engine ever has to propose
+    # (or reject) values outside it.
+    implied_lo, implied_hi = implied_bounds(units_total, lo, hi)
+    if isinstance(lo, Broadcast) and isinstance(hi, Broadcast):
+        return (Broadcast(max(lo.value, implied_lo.value), lo.parts),
+                Broadcast(min(hi.value, implied_hi.value), lo.parts))
+    return list(map(max, lo, implied_lo)), list(map(min, hi, implied_hi))
+
+
+def report(spec):
+    # A user bound is redundant when the bound implied by the total and the other
+    # parts is at least as strict, and binding when it cuts further.
+    user_lo, user_hi = spec.grid_bounds()
+    implied_lo, implied_hi = implied_bounds(spec.units()[1], user_lo, user_hi)
+    lo, hi = spec.grid_bounds(presolved=True)
+    parts = range(spec.parts)
+    return dict(
+        min=spec.from_units(list(lo)),
+        max=spec.from_units(list(hi)),
+        redundant_min=[i for i in parts if implied_lo[i] >= user_lo[i]],
+        redundant_max=[i for i in parts if implied_hi[i] <= user_hi[i]],
+        binding_min=[i for i in parts if implied_lo[i] < user_lo[i]],
+        binding_max=[i for i in parts if implied_hi[i] > user_hi[i]],
+        fixed=[i for i in parts if lo[i] == hi[i]],
+    )
@@ -0,0 +1,98 @@
+import numpy as np
+
+from .counter import sample_indices, stream_key, uniforms
+
+SEQUENCES = ('halton', 'sobol', 'lhs')
+# Counter "attempt" word reserved for the per-stream random shift.
+SHIFT_ATTEMPT = 0xFFFFFFFF
+
+
+def _primes(n):
+    primes, k = [], 2
+    while len(primes) < n:
+        if all(k % p for p in primes if p * p <= k):
+            primes.append(k)
+        k += 1
+    return np.array(primes, dtype=np.int64)
+
+
+def halton(start, n, dim):
+    # Radical inverse of indices start+1 .. start+n in the first `dim` prime bases;
+    # starting anywhere in the sequence costs nothing.
+    bases = _primes(dim)
+    index = np.arange(start + 1, start + n + 1, dtype=np.int64)[:, None].repeat(dim, axis=1)
+    points = np.zeros((n, dim))
+    factor = 1.0 / bases
+    while index.any():
+        points += (index % bases) * factor
+        index //= bases
+        factor /= bases
+    return points
+
+
+def latin_hypercube(rng, n, dim):
+    # One point per stratum [k/n, (k+1)/n) in every dimension, strata paired at random.
+    strata = rng.permuted(np.broadcast_to(np.arange(n), (dim, n)), axis=1).T
+    return (strata + rng.random((n, dim))) / n
+
+
+def sobol(seed, start, n, dim):
+    try:
+        from scipy.stats import qmc
+    except ImportError:
+        raise RuntimeError("sequence='sobol' needs scipy: pip install scipy") from None
+    engine = qmc.Sobol(dim, scramble=True, seed=seed)
+    if start:
+        engine.fast_forward(start)
+    return engine.random(n)
+
+
+def compositions(points, remaining):
+    # Maps points of the unit cube monotonically onto uniform compositions of
+    # `remaining` into points.shape[1] + 1 parts (stars and bars). The cut points
+    # are the order statistics of parts - 1 uniforms, drawn smallest first by
+    # inverting each one's Beta(1, m) conditional CDF; on the remaining + parts - 1
+    # slots they are sorted iid slots, so given that they are distinct they are a
+    # uniform subset. Returns (units, distinct).
+    rows, cut_count = points.shape
+    slots = remaining + cut_count
+    cuts = np.empty((rows, cut_count + 2), dtype=np.int64)
+    cuts[:, 0], cuts[:, -1] = -1, slots
+    position = np.zeros(rows)
+    for j in range(cut_count):
+        position += (1 - position) * -np.expm1(np.log1p(-points[:, j]) / (cut_count - j))
+        cuts[:, j + 1] = np.minimum(position * slots, slots - 1)
+    gaps = np.diff(cuts, axis=1) - 1
+    return gaps, (gaps[:, 1:-1] >= 0).all(axis=1)
+
+
+def sample_qmc(rng, entropy, spawn_key, n_samples, spec, sequence='halton', skip=0, max_attempts=1000):
+    # Rows uniform within the bounds (generate()'s law for alpha=1), each driven by
+    # one point of a low-discrepancy sequence. A point whose slots collide or whose
+    # composition breaks a cap is replaced by the same row of the counter-based
+    # 'dirichlet' stream (generate_range), which is independent of the point, so
+    # every row keeps the uniform law and still depends only on (seed, spec, index).
+    if sequence not in SEQUENCES:
+        raise ValueError(f"sequence must be one of {SEQUENCES}")
+    parts = spec.parts
+    dim = max(parts - 1, 1)
+    key = stream_key(entropy, spawn_key, spec)
+    indices = np.arange(skip, skip + n_samples, dtype=np.uint64)
+
+    if sequence == 'halton':
+        # Randomized QMC: one Cranley-Patterson shift per (seed, spec), so runs with
+        # different seeds give independent estimates and skip continues the sequence.
+        shift = uniforms(key, [0], SHIFT_ATTEMPT, dim)[0]
+        points = (halton(skip, n_samples, dim) + shift) % 1.0
+    elif sequence == 'sobol':
+        points = sobol(np.random.SeedSequence(key), skip, n_samples, dim)
+    else:
+        points = latin_hypercube(rng, n_samples, dim)
+
+    _, units_total, lo, caps = spec.unit_arrays()
+    units, ok = compositions(points[:, :parts - 1], units_total - int(lo.sum()))
+    ok &= (units <= caps).all(axis=1)
+    units += lo
+    if not ok.all():
+        units[~ok] = sample_indices(key, indices[~ok], spec, max_attempts, 'dirichlet')
+    return units
@@ -0,0 +1,143 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+from .batch import check_out, sample_units
+from .spec import Broadcast
+
+# File layout: MAGIC, completed chunks (uint64), JSON header length (uint32), the
+# JSON header, then padding up to a multiple of ALIGN where the C-order
+# (n_samples, parts) data starts. Only the chunk counter is ever rewritten.
+MAGIC = b'\x93RSGRAW\x01'
+PREFIX = struct.Struct('<8sQI')
+COUNTER_OFFSET = 8
+ALIGN = 64
+# Leading spawn-key word of the per-chunk streams, apart from spawn()'s children.
+CHUNK_STREAM = 0x52534746
+
+
+def _bound(vals):
+    return vals.value if isinstance(vals, Broadcast) else list(vals)
+
+
+def make_header(spec, method, entropy, spawn_key, n_samples, chunk_size):
+    if spec.mode == 'decimal':
+        raise ValueError("File output is only supported for 'int' and 'float' modes.")
+    return dict(
+        version=1,
+        dtype='<i8' if spec.mode == 'int' else '<f8',
+        shape=[n_samples, spec.parts],
+        chunk_size=chunk_size,
+        spec=dict(total=spec.total, parts=spec.parts, min_val=_bound(spec.min_vals), max_val=_bound(spec.max_vals),
+                  mode=spec.mode, precision=spec.precision, alpha=_bound(spec.alpha), digest=spec.digest()),
+        method=method,
+        seed=dict(entropy=entropy, spawn_key=list(spawn_key)),
+    )
+
+
+def read_header(path):
+    # The JSON header plus 'offset' (start of the data) and 'completed' (chunks
+    # known to be on disk).
+    with open(path, 'rb') as f:
+        prefix = f.read(PREFIX.size)
+        if len(prefix) < PREFIX.size or prefix[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a RandomSumGenerator raw file.")
+        _, completed, length = PREFIX.unpack(prefix)
+        header = json.loads(f.read(length))
+    header['offset'] = -(-(PREFIX.size + length) // ALIGN) * ALIGN
+    header['completed'] = completed
+    return header
+
+
+def load(path, mode='r'):
+    # Zero-copy view of the rows written so far, and the header.
+    header = read_header(path)
+    n_samples, parts = header['shape']
+    rows = min(n_samples, header['completed'] * header['chunk_size'])
+    if rows == 0:
+        return np.empty((0, parts), dtype=header['dtype']), header
+    return np.memmap(path, dtype=header['dtype'], mode=mode, offset=header['offset'], shape=(rows, parts)), header
+
+
+def _create(path, header):
+    body = json.dumps(header).encode()
+    offset = -(-(PREFIX.size + len(body)) // ALIGN) * ALIGN
+    n_samples, parts = header['shape']
+    f = open(path, 'w+b')
+    f.write(PREFIX.pack(MAGIC, 0, len(body)) + body)
+    # Sized up front (sparse where the filesystem allows); chunks fill it in place.
+    f.truncate(offset + n_samples * parts * 8)
+    return f, offset, 0
+
+
+def _changed(old, new, prefix=''):
+    # Dotted names of the header fields that differ, e.g. ['seed', 'spec.max_val'].
+    changed = []
+    for key in sorted(set(old) | set(new)):
+        a, b = old.get(key), new.get(key)
+        if isinstance(a, dict) and isinstance(b, dict):
+            changed += _changed(a, b, f"{prefix}{key}.")
+        elif a != b:
+            changed.append(prefix + key)
+    return changed
+
+
+def _reopen(path, header):
+    old = read_header(path)
+    offset, completed = old.pop('offset'), old.pop('completed')
+    changed = _changed(old, json.loads(json.dumps(header)))
+    if changed:
+        raise ValueError(f"{path} was started with a different {', '.join(changed)}; pass the same arguments "
+                         f"to resume it, or resume=False (rsg: --restart) to overwrite it.")
+    return open(path, 'r+b'), offset, completed
+
+
+def chunk_rng(entropy, spawn_key, index):
+    # Chunk k draws from its own stream, so the data depends on (seed, spec,
+    # chunk_size) only and a resumed run writes exactly what an uninterrupted one would.
+    return np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=tuple(spawn_key) + (CHUNK_STREAM, index)))
+
+
+def chunks(header, spec, max_attempts, stats, start=0):
+    # (index, row slice, values) for every chunk from `start` on.
+    n_samples = header['shape'][0]
+    chunk_size = header['chunk_size']
+    seed = header['seed']
+    scale = spec.units()[0]
+    for k in range(start, -(-n_samples // chunk_size)):
+        rows = slice(k * chunk_size, min(n_samples, (k + 1) * chunk_size))
+        units = sample_units(chunk_rng(seed['entropy'], seed['spawn_key'], k), rows.stop - rows.start, spec,
+                             max_attempts, header['method'], stats)
+        yield k, rows, units if spec.mode == 'int' else units / scale
+
+
+def write(path, header, spec, max_attempts, stats=None, resume=True):
+    if resume and os.path.exists(path):
+        f, offset, completed = _reopen(path, header)
+    else:
+        f, offset, completed = _create(path, header)
+    row_bytes = header['shape'][1] * 8
+    with f:
+        for k, rows, values in chunks(header, spec, max_attempts, stats, completed):
+            f.seek(offset + rows.start * row_bytes)
+            f.write(np.ascontiguousarray(values, dtype=header['dtype']).data)
+            # The data has to be on disk before the counter says so.
+            f.flush()
+            os.fsync(f.fileno())
+            f.seek(COUNTER_OFFSET)
+            f.write(struct.pack('<Q', k + 1))
+        f.flush()
+        os.fsync(f.fileno())
+    return load(path)[0]
+
+
+def fill(out, header, spec, max_attempts, stats=None):
+    # Same chunks as write(), into an array the caller provides (e.g. a np.memmap).
+    check_out(out, tuple(header['shape']), spec)
+    for _, rows, values in chunks(header, spec, max_attempts, stats):
+        out[rows] = values
+    if isinstance(out, np.memmap):
+        out.flush()
+    return out
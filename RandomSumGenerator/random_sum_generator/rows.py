@@ -0,0 +1,102 @@
+import numpy as np
+
+from .batch import compose, propose_rows, sample_exact_rows
+from .spec import MODES, grid_array
+
+# Rows sampled per vectorized pass; bounds the working set for millions of rows.
+CHUNK_ROWS = 65_536
+
+
+class RowsSpec:
+    # One split problem per row: row i divides totals[i] over `parts` parts within
+    # its own bounds. Compiled once into unit-grid arrays, presolved row by row,
+    # with rows that admit no split flagged instead of raised on.
+    def __init__(self, totals, parts=None, min_val=0, max_val=None, mode='float', precision=2):
+        if mode not in MODES:
+            raise ValueError("Mode must be 'int', 'float' or 'decimal'")
+        totals = np.asarray(totals, dtype=float)
+        if totals.ndim != 1:
+            raise ValueError(f"totals must be a 1-D sequence, got shape {totals.shape}.")
+        n = totals.size
+        if parts is None:
+            shapes = [np.shape(v) for v in (min_val, max_val) if v is not None and np.ndim(v)]
+            if not shapes:
+                raise ValueError("parts is required when min_val and max_val are scalars.")
+            parts = shapes[0][-1]
+        self.mode = mode
+        self.precision = precision
+        self.scale = 1 if mode == 'int' else 10 ** precision
+        self.parts = parts
+        self.size = n
+
+        shape = (n, parts)
+        self.totals = np.round(totals * self.scale).astype(np.int64)
+        try:
+            lo = np.broadcast_to(grid_array(min_val, self.scale, np.ceil), shape)
+            if max_val is None:
+                hi = np.broadcast_to(self.totals[:, None], shape)
+            else:
+                hi = np.broadcast_to(grid_array(max_val, self.scale, np.floor), shape)
+        except ValueError:
+            raise ValueError(f"min_val and max_val must be scalars, length-{parts} or shape {shape}.") from None
+
+        sum_lo, sum_hi = lo.sum(axis=1), hi.sum(axis=1)
+        self.feasible = (sum_lo <= self.totals) & (sum_hi >= self.totals) & (lo <= hi).all(axis=1)
+        # Presolve every row at once (see presolve.tighten).
+        t = self.totals[:, None]
+        lo, hi = np.maximum(lo, t - (sum_hi[:, None] - hi)), np.minimum(hi, t - (sum_lo[:, None] - lo))
+        lo[~self.feasible] = 0
+        hi[~self.feasible] = 0
+        self.totals[~self.feasible] = 0
+        self.lo = lo
+        self.caps = hi - lo
+
+    def __repr__(self):
+        return (f"RowsSpec(rows={self.size}, parts={self.parts}, infeasible={int((~self.feasible).sum())}, "
+                f"mode={self.mode!r})")
+
+
+def sample_rows(rng, spec, max_attempts=1000, method='exact', stats=None):
+    out = np.empty((spec.size, spec.parts), dtype=np.int64)
+    for start in range(0, spec.size, CHUNK_ROWS):
+        rows = slice(start, start + CHUNK_ROWS)
+        totals, lo, caps = spec.totals[rows], spec.lo[rows], spec.caps[rows]
+        if method == 'exact':
+            out[rows] = sample_exact_rows(rng, totals, lo, caps)
+            if stats is not None:
+                stats.record_call(method, totals.size, totals.size)
+        else:
+            out[rows] = _sample_rejection_rows(rng, totals, lo, caps, max_attempts, method, stats)
+    return out
+
+
+def _sample_rejection_rows(rng, totals, lo, caps, max_attempts, method, stats):
+    # Like batch.sample_rejection, but every row carries its own total and bounds;
+    # each round redraws only the rows rejected so far.
+    out = np.array(lo)
+    pending = (caps.sum(axis=1) > 0).nonzero()[0]
+    drawn = 0
+    for attempt in range(max_attempts):
+        if pending.size == 0:
+            break
+        drawn += pending.size
+        p_lo, p_caps = lo[pending], caps[pending]
+        if method == 'dirichlet':
+            adjusted = compose(rng, totals[pending] - p_lo.sum(axis=1), p_lo.shape[1]) + p_lo
+        else:
+            adjusted = propose_rows(rng.standard_exponential(p_lo.shape), totals[pending, None], p_lo, p_caps,
+                                    method)
+        shifted = adjusted - p_lo
+        ok = ((shifted >= 0) & (shifted <= p_caps)).all(axis=1)
+        if stats is not None:
+            stats.record_array_violations(shifted[~ok], p_caps[~ok])
+        out[pending[ok]] = adjusted[ok]
+        pending = pending[~ok]
+
+    if pending.size:
+        if stats is not None:
+            stats.record_failure(method, drawn)
+        raise RuntimeError(f"Failed to generate valid output for {pending.size} rows in {max_attempts} attempts.")
+    if stats is not None:
+        stats.record_call(method, totals.size, drawn)
+    return out
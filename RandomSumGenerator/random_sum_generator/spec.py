@@ -0,0 +1,234 @@
+import hashlib
+import math
+from array import array
+from decimal import Decimal
+from itertools import repeat
+
+MODES = ('int', 'float', 'decimal')
+
+
+class Broadcast:
+    # A scalar bound seen as a length-`parts` sequence, so a million parts with
+    # the same bound never turn into a million-element list.
+    __slots__ = ('value', 'parts')
+
+    def __init__(self, value, parts):
+        self.value = value
+        self.parts = parts
+
+    def __len__(self):
+        return self.parts
+
+    def __getitem__(self, i):
+        return self.value
+
+    def __iter__(self):
+        return repeat(self.value, self.parts)
+
+    def __eq__(self, other):
+        return isinstance(other, Broadcast) and (self.value, self.parts) == (other.value, other.parts)
+
+    def __repr__(self):
+        return f"Broadcast({self.value!r}, {self.parts})"
+
+
+def _normalize_bounds(val, parts):
+    if hasattr(val, '__len__'):
+        if len(val) != parts:
+            raise ValueError(f"List length of bounds must match parts. Got {len(val)} for {parts} parts.")
+        return array('d', val)
+    else:
+        return Broadcast(val, parts)
+
+
+def _bound_sum(vals):
+    return vals.value * vals.parts if isinstance(vals, Broadcast) else sum(vals)
+
+
+def _bound_key(vals):
+    return vals.value if isinstance(vals, Broadcast) else vals.tobytes()
+
+
+def grid_bounds(min_vals, max_vals, scale):
+    # User bounds rounded inwards onto the unit grid.
+    if isinstance(min_vals, Broadcast) and isinstance(max_vals, Broadcast):
+        parts = len(min_vals)
+        return (Broadcast(math.ceil(round(min_vals.value * scale, 6)), parts),
+                Broadcast(math.floor(round(max_vals.value * scale, 6)), parts))
+    return ([math.ceil(round(m * scale, 6)) for m in min_vals],
+            [math.floor(round(m * scale, 6)) for m in max_vals])
+
+
+def grid_array(values, scale, rounding):
+    # grid_bounds for NumPy arrays: values on the unit grid, rounded with `rounding`
+    # (np.ceil for lower bounds, np.floor for upper ones, np.round for totals).
+    import numpy as np
+    return rounding(np.round(np.asarray(values, dtype=float) * scale, 6)).astype(np.int64)
+
+
+def to_units(total, min_vals, max_vals, mode, precision):
+    # Every engine works on an integer grid: whole numbers for 'int', steps of
+    # 10**-precision otherwise. Values only leave the grid in from_units. The
+    # bounds come back presolved (see presolve.tighten).
+    from .presolve import tighten
+
+    scale = 1 if mode == 'int' else 10 ** precision
+    units_total = round(total * scale)
+    lo, hi = grid_bounds(min_vals, max_vals, scale)
+    if _bound_sum(lo) > units_total or _bound_sum(hi) < units_total:
+        raise ValueError(f"Bounds leave no feasible values at precision {0 if mode == 'int' else precision}.")
+    lo, hi = tighten(units_total, lo, hi)
+    if isinstance(lo, Broadcast):
+        return scale, units_total, lo, Broadcast(hi.value - lo.value, lo.parts)
+    return scale, units_total, lo, [h - l for h, l in zip(hi, lo)]
+
+
+def from_units(values, scale, mode, precision):
+    if mode == 'int':
+        return values
+    if mode == 'decimal':
+        return [Decimal(v).scaleb(-precision) for v in values]
+    return [v / scale for v in values]
+
+
+class GenerationSpec:
+    # Validated once, then reused by every entry point; the derived views
+    # (NumPy arrays, integer grid) are built lazily and cached on the spec.
+    __slots__ = ('total', 'parts', 'mode', 'precision', 'min_vals', 'max_vals', 'ranges', 'tight_upper', 'alpha',
+                 'flat', '_key', '_hash', '_cache')
+
+    def __init__(self, total, parts, min_val=0, max_val=None, mode='float', precision=2, alpha=1.0):
+        if mode not in MODES:
+            raise ValueError("Mode must be 'int', 'float' or 'decimal'")
+        if max_val is None:
+            max_val = total
+
+        min_vals = _normalize_bounds(min_val, parts)
+        max_vals = _normalize_bounds(max_val, parts)
+        alpha = _normalize_bounds(alpha, parts)
+        if (alpha.value <= 0) if isinstance(alpha, Broadcast) else (min(alpha) <= 0):
+            raise ValueError("alpha must be positive.")
+
+        # 🧠 Feasibility Check
+        if _bound_sum(min_vals) > total:
+            raise ValueError("Sum of min_vals is too high for the given total.")
+        if _bound_sum(max_vals) < total:
+            raise ValueError("Sum of max_vals is too low to reach the total.")
+
+        avg = round(total / parts, 5)
+        if isinstance(max_vals, Broadcast):
+            self.tight_upper = round(max_vals.value, 5) <= avg
+        else:
+            self.tight_upper = all(round(m, 5) <= avg for m in max_vals)
+
+        self.total = total
+        self.parts = parts
+        self.mode = mode
+        self.precision = precision
+        self.min_vals = min_vals
+        self.max_vals = max_vals
+        if isinstance(min_vals, Broadcast) and isinstance(max_vals, Broadcast):
+            self.ranges = Broadcast(max_vals.value - min_vals.value, parts)
+        else:
+            self.ranges = array('d', [h - l for l, h in zip(min_vals, max_vals)])
+        self.alpha = alpha
+        # 'exact' and 'dp' take no alpha; only a flat Dirichlet (every alpha 1) goes with them.
+        self.flat = isinstance(alpha, Broadcast) and alpha.value == 1
+        self._key = (total, parts, _bound_key(min_vals), _bound_key(max_vals), mode, precision, _bound_key(alpha))
+        self._hash = hash(self._key)
+        self._cache = {}
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if not isinstance(other, GenerationSpec):
+            return NotImplemented
+        return self is other or (self._hash == other._hash and self._key == other._key)
+
+    def __repr__(self):
+        alpha = '' if self.flat else f", alpha={self.alpha!r}"
+        return (f"GenerationSpec(total={self.total}, parts={self.parts}, mode={self.mode!r}, "
+                f"precision={self.precision}{alpha})")
+
+    def digest(self):
+        # Stable across processes and machines, unlike hash(), which is salted per process.
+        # Numbers are normalized so equal specs (total=100 vs 100.0) share a digest.
+        if 'digest' not in self._cache:
+            key = tuple(float(v) if isinstance(v, (int, float)) else v for v in self._key)
+            self._cache['digest'] = hashlib.sha256(repr(key).encode()).hexdigest()
+        return self._cache['digest']
+
+    def __getstate__(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__ if slot != '_cache'}
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            object.__setattr__(self, slot, value)
+        self._cache = {}
+
+    def memo(self, key, compute):
+        # Derived values other modules cache per spec (plans, pilot estimates); they
+        # are freed with the spec instead of outliving it in a global cache.
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def grid_bounds(self, presolved=False):
+        # (lo, hi) on the unit grid, as given or after presolve.
+        if not presolved:
+            return grid_bounds(self.min_vals, self.max_vals, self.units()[0])
+        _, _, lo, caps = self.units()
+        if isinstance(lo, Broadcast):
+            return lo, Broadcast(lo.value + caps.value, self.parts)
+        return lo, [l + c for l, c in zip(lo, caps)]
+
+    def bounds(self):
+        # Presolved (min_vals, max_vals, ranges) in output units: what the rejection
+        # engines scale their proposals into.
+        if 'bounds' not in self._cache:
+            scale, _, lo, caps = self.units()
+            hi = self.grid_bounds(presolved=True)[1]
+            self._cache['bounds'] = tuple(_scaled(v, scale) for v in (lo, hi, caps))
+        return self._cache['bounds']
+
+    def arrays(self):
+        # Scalar bounds become zero-copy broadcast views, per-part bounds share
+        # the array('d') buffers.
+        if 'arrays' not in self._cache:
+            self._cache['arrays'] = tuple(_as_numpy(v, self.parts, float) for v in self.bounds())
+        return self._cache['arrays']
+
+    def alpha_array(self):
+        if 'alpha' not in self._cache:
+            self._cache['alpha'] = _as_numpy(self.alpha, self.parts, float)
+        return self._cache['alpha']
+
+    def units(self):
+        if 'units' not in self._cache:
+            self._cache['units'] = to_units(self.total, self.min_vals, self.max_vals, self.mode, self.precision)
+        return self._cache['units']
+
+    def from_units(self, values):
+        scale = self.units()[0]
+        return from_units(values, scale, self.mode, self.precision)
+
+    def unit_arrays(self):
+        if 'unit_arrays' not in self._cache:
+            scale, units_total, lo, caps = self.units()
+            self._cache['unit_arrays'] = (scale, units_total, _as_numpy(lo, self.parts, 'int64'),
+                                          _as_numpy(caps, self.parts, 'int64'))
+        return self._cache['unit_arrays']
+
+
+def _scaled(vals, scale):
+    if isinstance(vals, Broadcast):
+        return Broadcast(vals.value / scale, vals.parts)
+    return array('d', [v / scale for v in vals])
+
+
+def _as_numpy(vals, parts, dtype):
+    import numpy as np
+    if isinstance(vals, Broadcast):
+        return np.broadcast_to(np.asarray(vals.value, dtype=dtype), (parts,))
+    return np.asarray(vals, dtype=dtype)
@@ -0,0 +1,115 @@
+from collections import Counter
+from time import perf_counter
+
+# Upper edges of the per-call acceptance-rate buckets (accepted / attempts).
+HISTOGRAM_EDGES = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class GenerationStats:
+    # Cumulative counters for one generator. Only touched when stats are enabled,
+    # so a generator built with stats=False pays a single `is None` check per call.
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.samples = 0
+        self.attempts = 0
+        self.failures = 0
+        self.methods = Counter()
+        self.rejections_min = Counter()
+        self.rejections_max = Counter()
+        self.sampling_time = 0.0
+        self.checking_time = 0.0
+        self.acceptance_histogram = [0] * len(HISTOGRAM_EDGES)
+
+    @property
+    def rejections(self):
+        return self.attempts - self.samples
+
+    @property
+    def acceptance_rate(self):
+        return self.samples / self.attempts if self.attempts else None
+
+    @property
+    def mean_attempts(self):
+        return self.attempts / self.samples if self.samples else None
+
+    def record_call(self, method, samples, attempts):
+        self.calls += 1
+        self.samples += samples
+        self.attempts += attempts
+        self.methods[method] += 1
+        if attempts:
+            rate = samples / attempts
+            for i, edge in enumerate(HISTOGRAM_EDGES):
+                if rate <= edge:
+                    self.acceptance_histogram[i] += 1
+                    break
+
+    def record_failure(self, method, attempts):
+        self.calls += 1
+        self.failures += 1
+        self.attempts += attempts
+        self.methods[method] += 1
+        self.acceptance_histogram[0] += 1
+
+    def measure_attempt(self, draw, within, rng, spec):
+        start = perf_counter()
+        values = draw(rng, spec)
+        drawn = perf_counter()
+        accepted = within(values, spec)
+        self.sampling_time += drawn - start
+        self.checking_time += perf_counter() - drawn
+        if not accepted:
+            self.record_violations(values, spec)
+        return values, accepted
+
+    def record_violations(self, units, spec):
+        lo, caps = spec.units()[2:]
+        for i, value in enumerate(units):
+            if value < lo[i]:
+                self.rejections_min[i] += 1
+            elif value - lo[i] > caps[i]:
+                self.rejections_max[i] += 1
+
+    def record_array_violations(self, shifted, caps):
+        # shifted: rejected rows on the unit grid, minus the lower bounds.
+        for counter, counts in ((self.rejections_min, (shifted < 0).sum(axis=0)),
+                                (self.rejections_max, (shifted > caps).sum(axis=0))):
+            for i in counts.nonzero()[0].tolist():
+                counter[i] += int(counts[i])
+
+    def merge(self, other):
+        self.calls += other.calls
+        self.samples += other.samples
+        self.attempts += other.attempts
+        self.failures += other.failures
+        self.methods.update(other.methods)
+        self.rejections_min.update(other.rejections_min)
+        self.rejections_max.update(other.rejections_max)
+        self.sampling_time += other.sampling_time
+        self.checking_time += other.checking_time
+        self.acceptance_histogram = [a + b for a, b in zip(self.acceptance_histogram, other.acceptance_histogram)]
+        return self
+
+    def as_dict(self):
+        return dict(
+            calls=self.calls,
+            samples=self.samples,
+            attempts=self.attempts,
+            rejections=self.rejections,
+            failures=self.failures,
+            acceptance_rate=self.acceptance_rate,
+            mean_attempts=self.mean_attempts,
+            methods=dict(self.methods),
+            rejections_min=dict(self.rejections_min),
+            rejections_max=dict(self.rejections_max),
+            sampling_time=self.sampling_time,
+            checking_time=self.checking_time,
+            acceptance_histogram=dict(zip(HISTOGRAM_EDGES, self.acceptance_histogram)),
+        )
+
+    def __repr__(self):
+        return (f"GenerationStats(calls={self.calls}, samples={self.samples}, attempts={self.attempts}, "
+                f"rejections={self.rejections})")
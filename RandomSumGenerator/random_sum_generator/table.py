@@ -0,0 +1,232 @@
+import math
+from decimal import Decimal
+
+import numpy as np
+
+from .spec import grid_array
+
+# numpy's multivariate_hypergeometric needs sum(colors) below this.
+HYPERGEOMETRIC_LIMIT = 10 ** 9
+SWEEPS = 16
+
+
+def _margins(sums, scale, name):
+    units = np.atleast_1d(grid_array(sums, scale, np.round))
+    if units.ndim != 1 or units.size == 0:
+        raise ValueError(f"{name} must be a non-empty 1-D sequence.")
+    if not np.allclose(units, np.asarray(sums, dtype=float) * scale):
+        raise ValueError(f"{name} must lie on the output grid (precision {int(math.log10(scale))}).")
+    return units
+
+
+def _start(rng, rows, cols):
+    # Column by column, deal each column's units out of the rows' remaining units
+    # without replacement. With no binding caps this is the exact Fisher
+    # (hypergeometric) table for these margins.
+    if rows.sum() >= HYPERGEOMETRIC_LIMIT:
+        return _northwest(rows, cols)
+    table = np.empty((rows.size, cols.size), dtype=np.int64)
+    remaining = rows.copy()
+    for j, c in enumerate(cols.tolist()):
+        table[:, j] = rng.multivariate_hypergeometric(remaining, c, method='marginals')
+        remaining -= table[:, j]
+    return table
+
+
+def _northwest(rows, cols):
+    # Deterministic start for grids too fine for the hypergeometric sampler; the
+    # mixing sweeps randomize it.
+    table = np.zeros((rows.size, cols.size), dtype=np.int64)
+    rows, cols = rows.copy(), cols.copy()
+    i = j = 0
+    while i < rows.size and j < cols.size:
+        step = min(rows[i], cols[j])
+        table[i, j] = step
+        rows[i] -= step
+        cols[j] -= step
+        if rows[i] == 0:
+            i += 1
+        else:
+            j += 1
+    return table
+
+
+def _targeted(rng, table, caps):
+    # One block per cell above its cap, completed with a random row and column.
+    # Blocks only have to be disjoint cell-wise to keep every margin, so any block
+    # sharing a cell with another one is dropped.
+    rows, cols = table.shape
+    i, j = (table > caps).nonzero()
+    k = (i + rng.integers(1, rows, size=i.size)) % rows
+    l = (j + rng.integers(1, cols, size=j.size)) % cols
+    cells = np.concatenate([i * cols + j, i * cols + l, k * cols + j, k * cols + l])
+    use = np.bincount(cells, minlength=table.size)[cells].reshape(4, -1)
+    keep = (use == 1).all(axis=0)
+    return i[keep], k[keep], j[keep], l[keep]
+
+
+def _shift(rng, a, b, c, d, ua, ub, uc, ud, repair):
+    # Units t moved around each 2x2 block: a += t, b -= t, c -= t, d += t keeps
+    # every margin. Mixing draws t uniformly from the range that keeps the block
+    # inside [0, caps] (a heat-bath step, which leaves the uniform distribution over
+    # bounded tables invariant); repair instead picks the t that removes the most excess.
+    low = np.maximum(-a, -d)
+    high = np.minimum(b, c)
+    if repair:
+        def excess(t):
+            return (np.maximum(a + t - ua, 0) + np.maximum(b - t - ub, 0)
+                    + np.maximum(c - t - uc, 0) + np.maximum(d + t - ud, 0))
+        candidates = [np.zeros_like(a)] + [np.clip(t, low, high) for t in (ua - a, b - ub, c - uc, ud - d)]
+        return np.choose(np.stack([excess(t) for t in candidates]).argmin(axis=0), candidates)
+    low = np.maximum(low, np.maximum(b - ub, c - uc))
+    high = np.minimum(high, np.minimum(ua - a, ud - d))
+    return low + (rng.random(low.shape) * (high - low + 1)).astype(np.int64)
+
+
+def _sweep(rng, table, caps, order, repair=False):
+    # Shuffle rows and columns, then pair them up in place: every (row pair, column
+    # pair) is a disjoint 2x2 block, so the blocks tile (almost) the whole table and
+    # move at once. The table stays shuffled; `order` tracks the original labels.
+    r, c = rng.permutation(table.shape[0]), rng.permutation(table.shape[1])
+    table = table.take(r, axis=0).take(c, axis=1)
+    caps = caps.take(r, axis=0).take(c, axis=1)
+    order[0], order[1] = order[0][r], order[1][c]
+
+    rows, cols = table.shape[0] // 2 * 2, table.shape[1] // 2 * 2
+    if rows and cols:
+        x = table[:rows, :cols].reshape(rows // 2, 2, cols // 2, 2)
+        u = caps[:rows, :cols].reshape(x.shape)
+        t = _shift(rng, x[:, 0, :, 0], x[:, 0, :, 1], x[:, 1, :, 0], x[:, 1, :, 1],
+                   u[:, 0, :, 0], u[:, 0, :, 1], u[:, 1, :, 0], u[:, 1, :, 1], repair)
+        x[:, 0, :, 0] += t
+        x[:, 0, :, 1] -= t
+        x[:, 1, :, 0] -= t
+        x[:, 1, :, 1] += t
+        table[:rows, :cols] = x.reshape(rows, cols)
+    return table, caps
+
+
+def _sweep_targeted(rng, table, caps):
+    i, k, j, l = _targeted(rng, table, caps)
+    cells = ((i, j), (i, l), (k, j), (k, l))
+    t = _shift(rng, *(table[c] for c in cells), *(caps[c] for c in cells), repair=True)
+    table[i, j] += t
+    table[i, l] -= t
+    table[k, j] -= t
+    table[k, l] += t
+
+
+def _augment(table, caps, i0, j0):
+    # Breadth-first search for an alternating cycle through (i0, j0): raise a cell
+    # with slack in the current row, lower a positive cell in that column, and so
+    # on until some row can raise column j0. A feasible table always has such a
+    # cycle through a cell above its cap.
+    rows, cols = table.shape
+    slack = caps - table
+    slack[i0, j0] = 0
+    row_from = np.full(rows, -1)
+    col_from = np.full(cols, -1)
+    row_from[i0] = j0
+    frontier = np.array([i0])
+    while frontier.size:
+        reach = slack[frontier] > 0
+        reach[:, col_from >= 0] = False
+        hit = reach.any(axis=0).nonzero()[0]
+        if hit.size == 0:
+            return False
+        col_from[hit] = frontier[reach[:, hit].argmax(axis=0)]
+        if col_from[j0] >= 0:
+            break
+        down = table[:, hit] > 0
+        down[row_from >= 0] = False
+        new = down.any(axis=1).nonzero()[0]
+        row_from[new] = hit[down[new].argmax(axis=1)]
+        frontier = new
+    else:
+        return False
+
+    raised, lowered = [], [(i0, j0)]
+    j = j0
+    while True:
+        i = col_from[j]
+        raised.append((i, j))
+        if i == i0:
+            break
+        j = row_from[i]
+        lowered.append((i, j))
+    step = min([table[i0, j0] - caps[i0, j0]] + [slack[c] for c in raised] + [table[c] for c in lowered[1:]])
+    for c in raised:
+        table[c] += step
+    for c in lowered:
+        table[c] -= step
+    return True
+
+
+def _repair(rng, table, caps, order, max_stall=32):
+    # Whole-table sweeps while violations are common, then blocks aimed at the
+    # remaining ones; whatever is left after that goes to _augment.
+    best, stall = None, 0
+    while True:
+        over = table > caps
+        excess = (table[over] - caps[over]).sum()
+        if excess == 0:
+            return table, caps
+        if best is None or excess < best:
+            best, stall = excess, 0
+        elif stall >= max_stall:
+            break
+        stall += 1
+        if over.sum() * 64 > table.size:
+            table, caps = _sweep(rng, table, caps, order, repair=True)
+        else:
+            _sweep_targeted(rng, table, caps)
+
+    for i, j in zip(*(table > caps).nonzero()):
+        while table[i, j] > caps[i, j]:
+            if not _augment(table, caps, i, j):
+                raise ValueError("No table with these margins satisfies the cell bounds.")
+    return table, caps
+
+
+def sample_table(rng, row_sums, col_sums, min_cell=0, max_cell=None, mode='float', precision=2, sweeps=SWEEPS):
+    scale = 1 if mode == 'int' else 10 ** precision
+    rows = _margins(row_sums, scale, 'row_sums')
+    cols = _margins(col_sums, scale, 'col_sums')
+    if rows.sum() != cols.sum():
+        raise ValueError(f"row_sums and col_sums must have the same total, got {rows.sum() / scale} "
+                         f"and {cols.sum() / scale}.")
+    if (rows < 0).any() or (cols < 0).any():
+        raise ValueError("row_sums and col_sums must be non-negative.")
+
+    shape = (rows.size, cols.size)
+    lo = np.broadcast_to(grid_array(min_cell, scale, np.ceil), shape)
+    if max_cell is None:
+        caps = np.full(shape, rows.sum()) - lo
+    else:
+        caps = np.broadcast_to(grid_array(max_cell, scale, np.floor), shape) - lo
+    if (lo < 0).any() or (caps < 0).any():
+        raise ValueError(f"Cell bounds leave no feasible values at precision {0 if mode == 'int' else precision}.")
+
+    # Shift every lower bound to 0; the caps are then the only constraint.
+    rows = rows - lo.sum(axis=1)
+    cols = cols - lo.sum(axis=0)
+    if (rows < 0).any() or (cols < 0).any():
+        raise ValueError("Sum of min_cell is too high for the given margins.")
+    if (caps.sum(axis=1) < rows).any() or (caps.sum(axis=0) < cols).any():
+        raise ValueError("Sum of max_cell is too low to reach the given margins.")
+
+    caps = np.minimum(caps, np.minimum.outer(rows, cols))
+    table = _start(rng, rows, cols)
+    order = [np.arange(rows.size), np.arange(cols.size)]
+    table, caps = _repair(rng, table, caps, order)
+    for _ in range(sweeps):
+        table, caps = _sweep(rng, table, caps, order)
+    result = np.empty_like(table)
+    result[np.ix_(*order)] = table
+    table = result + lo
+
+    if mode == 'int':
+        return table
+    if mode == 'decimal':
+        return np.frompyfunc(lambda v: Decimal(v).scaleb(-precision), 1, 1)(table.astype(object))
+    return table / scale
@@ -24,4 +24,12 @@ setup(
     license="MIT",
     python_requires='>=3.6',
     install_requires=[],
+    extras_require={
+        "numpy": ["numpy"],
+        "parquet": ["numpy", "pyarrow"],
+        "test": ["numpy", "pytest"],
+    },
+    entry_points={
+        "console_scripts": ["rsg=random_sum_generator.cli:main"],
+    },
 )
\ No newline at end of file
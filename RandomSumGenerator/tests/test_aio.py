@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from random_sum_generator import RandomSumGenerator  # noqa: E402
+
+CASE = dict(total=100, parts=5, min_val=2, max_val=40)
+
+
+def test_concurrent_calls_share_one_batch():
+    async def main(gen):
+        return await asyncio.gather(*(gen.agenerate(**CASE) for _ in range(50)))
+
+    gen = RandomSumGenerator(seed=3)
+    rows = asyncio.run(main(gen))
+    assert len(rows) == 50 and len({tuple(r) for r in rows}) == 50
+    for row in rows:
+        assert len(row) == 5 and abs(sum(row) - 100) < 1e-9
+        assert all(2 <= v <= 40 for v in row)
+    # One coalesced generate_batch: the same rows a single batch call draws, dealt
+    # out in arrival order.
+    batch = RandomSumGenerator(seed=3).generate_batch(50, method=gen.last_method, **CASE)
+    assert np.allclose(np.array(rows), batch)
+
+
+def test_different_specs_are_not_mixed():
+    async def main(gen):
+        return await asyncio.gather(gen.agenerate(**CASE), gen.agenerate(10, 3, mode='int'),
+                                    gen.agenerate(**CASE))
+
+    first, other, second = asyncio.run(main(RandomSumGenerator(seed=3)))
+    assert abs(sum(first) - 100) < 1e-9 and abs(sum(second) - 100) < 1e-9 and first != second
+    assert sum(other) == 10 and all(isinstance(v, int) for v in other)
+
+
+def test_event_loop_keeps_running():
+    async def main(gen):
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.ensure_future(ticker())
+        row = await gen.agenerate(**CASE, window=0.05)
+        task.cancel()
+        return row, ticks
+
+    row, ticks = asyncio.run(main(RandomSumGenerator(seed=3)))
+    assert abs(sum(row) - 100) < 1e-9
+    assert ticks > 10
+
+
+def test_errors_reach_every_waiter():
+    async def main(gen):
+        return await asyncio.gather(*(gen.agenerate(100, 5, max_val=20.01, method='dirichlet', max_attempts=1)
+                                      for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(main(RandomSumGenerator(seed=3))))
@@ -0,0 +1,30 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from random_sum_generator import RandomSumGenerator  # noqa: E402
+
+FRAME = {
+    'group': np.array(['a', 'b', 'a', 'c', 'b', 'a']),
+    'total': np.array([30.0, 10.0, 30.0, 5.0, 10.0, 30.0]),
+    'cap': np.array([20.0, 6.0, 20.0, 5.0, 6.0, 20.0]),
+}
+
+
+@pytest.mark.parametrize('method', ['exact', 'auto', 'dirichlet'])
+def test_groups_sum_to_their_totals(method):
+    gen = RandomSumGenerator(seed=1)
+    values = gen.allocate(FRAME, 'group', 'total', max_col='cap', method=method)
+    assert gen.last_method == ('dirichlet' if method == 'auto' else method)
+    for group, total in (('a', 30), ('b', 10), ('c', 5)):
+        assert values[FRAME['group'] == group].sum() == pytest.approx(total)
+    assert (values <= FRAME['cap']).all() and (values >= 0).all()
+
+
+def test_infeasible_group_raises_or_coerces():
+    frame = dict(FRAME, cap=np.array([20.0, 4.0, 20.0, 5.0, 4.0, 20.0]))   # group b can reach only 8 of 10
+    with pytest.raises(ValueError, match='b'):
+        RandomSumGenerator(seed=1).allocate(frame, 'group', 'total', max_col='cap')
+    values = RandomSumGenerator(seed=1).allocate(frame, 'group', 'total', max_col='cap', errors='coerce')
+    assert np.isnan(values[frame['group'] == 'b']).all()
+    assert not np.isnan(values[frame['group'] != 'b']).any()
@@ -0,0 +1,154 @@
+"""Conformance of the generate_batch backends.
+
+Every registered backend must return valid rows (totals, bounds, grid, types),
+reproduce them from a seed, and sample the same distribution as the others for
+the same engine. The uniform engines are also checked against an exact
+enumeration of a small problem. Run from the RandomSumGenerator directory:
+
+    python -m pytest tests
+"""
+import itertools
+import math
+from decimal import Decimal
+
+import pytest
+
+from random_sum_generator import RandomSumGenerator, backends
+from random_sum_generator.backends import BACKENDS
+
+CASES = [
+    dict(total=100, parts=4, min_val=5, max_val=40, mode='float'),
+    dict(total=100, parts=6, min_val=[0, 0, 0, 0, 0, 30], max_val=[20, 20, 20, 20, 20, 90], mode='float'),
+    dict(total=50, parts=5, min_val=2, max_val=20, mode='int'),
+    dict(total=10, parts=3, min_val=0, max_val=6, mode='decimal', precision=3),
+]
+METHODS = ['auto', 'exact', 'rejection', 'dirichlet', 'dp']
+AVAILABLE = [name for name, backend in BACKENDS.items() if backend.available()]
+N_SAMPLES = 4000
+
+
+def _bounds(case):
+    parts = case['parts']
+    lo, hi = case.get('min_val', 0), case.get('max_val', case['total'])
+    return (lo if isinstance(lo, list) else [lo] * parts), (hi if isinstance(hi, list) else [hi] * parts)
+
+
+def _rows(backend, case, method, n_samples=N_SAMPLES, seed=1):
+    gen = RandomSumGenerator(seed=seed)
+    return BACKENDS[backend].rows(gen.generate_batch(n_samples, method=method, backend=backend, **case))
+
+
+def _columns(rows):
+    return [[float(v) for v in col] for col in zip(*rows)]
+
+
+def _mean(values):
+    return sum(values) / len(values)
+
+
+def _var(values):
+    m = _mean(values)
+    return sum((v - m) ** 2 for v in values) / (len(values) - 1)
+
+
+def _chi2_critical(df, z=4.265):
+    # Wilson-Hilferty approximation of the chi-square quantile; z = 4.265 is the
+    # one-sided 1e-5 normal quantile, so a correct sampler fails ~never.
+    return df * (1 - 2 / (9 * df) + z * math.sqrt(2 / (9 * df))) ** 3
+
+
+@pytest.mark.parametrize('backend', AVAILABLE)
+@pytest.mark.parametrize('method', METHODS)
+@pytest.mark.parametrize('case', CASES, ids=lambda c: f"{c['mode']}-{c['parts']}")
+def test_rows_are_valid(backend, method, case):
+    rows = _rows(backend, case, method, n_samples=500)
+    lo, hi = _bounds(case)
+    step = Decimal(1) if case['mode'] == 'int' else Decimal(1).scaleb(-case.get('precision', 2))
+    assert len(rows) == 500
+    for row in rows:
+        assert len(row) == case['parts']
+        values = [Decimal(str(v)) for v in row]
+        assert sum(values) == Decimal(str(case['total']))
+        assert not any(v % step for v in values), f"{row} is off the {step} grid"
+        assert all(Decimal(str(l)) <= v <= Decimal(str(h)) for v, l, h in zip(values, lo, hi)), row
+        if case['mode'] == 'decimal':
+            assert all(isinstance(v, Decimal) for v in row)
+        elif case['mode'] == 'int':
+            assert all(float(v).is_integer() for v in row)
+
+
+@pytest.mark.parametrize('backend', AVAILABLE)
+@pytest.mark.parametrize('method', METHODS)
+def test_seed_reproducible(backend, method):
+    case = CASES[1]
+    assert _rows(backend, case, method, n_samples=200) == _rows(backend, case, method, n_samples=200)
+    assert _rows(backend, case, method, n_samples=200) != _rows(backend, case, method, n_samples=200, seed=2)
+
+
+@pytest.mark.skipif(len(AVAILABLE) < 2, reason="needs NumPy for a second backend")
+@pytest.mark.parametrize('method', METHODS)
+@pytest.mark.parametrize('case', CASES, ids=lambda c: f"{c['mode']}-{c['parts']}")
+def test_backends_agree(method, case):
+    # Same engine on different streams: per-part means and variances, and the mean
+    # of the largest part, must agree within sampling error (6 standard errors).
+    samples = {name: _rows(name, case, method) for name in AVAILABLE}
+    reference, *others = AVAILABLE
+    ref_cols = _columns(samples[reference])
+    for name in others:
+        cols = _columns(samples[name])
+        stats = [(a, b) for a, b in zip(ref_cols, cols)]
+        stats.append(([max(r) for r in zip(*ref_cols)], [max(r) for r in zip(*cols)]))
+        for a, b in stats:
+            se = math.sqrt((_var(a) + _var(b)) / N_SAMPLES)
+            assert abs(_mean(a) - _mean(b)) <= 6 * se + 1e-9, (name, method)
+            # The variance of a sample variance is about 2 var^2 / n for these light tails.
+            se_var = math.sqrt(2 * (_var(a) ** 2 + _var(b) ** 2) / N_SAMPLES) * 1.5
+            assert abs(_var(a) - _var(b)) <= 6 * se_var + 1e-9, (name, method)
+
+
+SMALL = dict(total=12, parts=4, max_val=[12, 2, 3, 12], mode='int')
+
+
+def _compositions(case):
+    caps = case['max_val']
+    return [c for c in itertools.product(*(range(h + 1) for h in caps)) if sum(c) == case['total']]
+
+
+def _chi2_uniform(rows, support):
+    counts = dict.fromkeys(support, 0)
+    for row in rows:
+        counts[tuple(int(v) for v in row)] += 1
+    expected = len(rows) / len(support)
+    return sum((c - expected) ** 2 / expected for c in counts.values())
+
+
+@pytest.mark.parametrize('backend', AVAILABLE)
+@pytest.mark.parametrize('method', ['auto', 'dirichlet', 'dp'])
+def test_uniform_engines_match_enumeration(backend, method):
+    support = _compositions(SMALL)
+    rows = _rows(backend, SMALL, method, n_samples=40 * len(support))
+    assert _chi2_uniform(rows, support) < _chi2_critical(len(support) - 1)
+
+
+@pytest.mark.parametrize('backend', AVAILABLE)
+def test_exact_is_not_uniform(backend):
+    # 'exact' trades uniformity for never rejecting; this documents the bias.
+    support = _compositions(SMALL)
+    rows = _rows(backend, SMALL, 'exact', n_samples=200 * len(support))
+    assert _chi2_uniform(rows, support) > 2 * _chi2_critical(len(support) - 1)
+
+
+def test_iter_generate_chooses_backend_for_whole_stream(monkeypatch):
+    seen = []
+    choose = backends.choose
+
+    def spy(name, n_samples, spec):
+        seen.append(n_samples)
+        return choose(name, n_samples, spec)
+
+    monkeypatch.setattr(backends, 'choose', spy)
+    gen = RandomSumGenerator(seed=1)
+    next(gen.iter_generate(100, 4, min_val=5, max_val=40, chunk_size=16, limit=200_000))
+    next(gen.iter_generate(100, 4, min_val=5, max_val=40, chunk_size=16))
+    next(gen.iter_generate(100, 4, min_val=5, max_val=40, chunk_size=16, limit=3))
+    assert seen == [200_000, float('inf'), 3]
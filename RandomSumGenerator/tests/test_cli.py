@@ -0,0 +1,55 @@
+import sys
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from random_sum_generator.cli import main  # noqa: E402
+
+
+def test_bad_method_leaves_output_untouched(tmp_path, capsys):
+    path = tmp_path / 'z.csv'
+    path.write_text('precious')
+    with pytest.raises(SystemExit) as exc:
+        main(['generate', '--total', '100', '--parts', '4', '--alpha', '1,2,3,4', '--method', 'exact', '-n', '3',
+              '-o', str(path)])
+    assert exc.value.code == 2
+    assert capsys.readouterr().err.startswith('rsg: error:')
+    assert path.read_text() == 'precious'
+
+
+ARGS = ['generate', '--total', '100', '--parts', '4', '--min', '5', '--max', '40', '-n', '10', '--seed', '7']
+
+
+def test_csv_to_stdout(capsysbinary):
+    assert main(ARGS + ['--chunk-size', '3']) == 0
+    lines = capsysbinary.readouterr().out.decode().splitlines()
+    assert lines[0] == 'p0,p1,p2,p3' and len(lines) == 11
+    for line in lines[1:]:
+        values = [float(v) for v in line.split(',')]
+        assert round(sum(values), 2) == 100 and all(5 <= v <= 40 for v in values)
+
+
+def test_npy_and_raw_files_match(tmp_path):
+    from random_sum_generator import rawfile
+
+    assert main(ARGS + ['--format', 'npy', '-o', str(tmp_path / 'a.npy'), '--workers', '2']) == 0
+    assert main(ARGS + ['--format', 'npy', '-o', str(tmp_path / 'b.npy')]) == 0
+    a, b = np.load(tmp_path / 'a.npy'), np.load(tmp_path / 'b.npy')
+    assert a.shape == (10, 4) and (a == b).all()
+    assert main(ARGS + ['--format', 'raw', '-o', str(tmp_path / 'c.rsg')]) == 0
+    values, _ = rawfile.load(str(tmp_path / 'c.rsg'))
+    assert values.shape == (10, 4) and np.allclose(values.sum(axis=1), 100)
+
+
+def test_missing_dependencies_are_clean_errors(tmp_path, capsys, monkeypatch):
+    path = tmp_path / 'z.parquet'
+    path.write_text('precious')
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    with pytest.raises(SystemExit):
+        main(ARGS + ['--format', 'parquet', '-o', str(path)])
+    assert 'needs pyarrow' in capsys.readouterr().err and path.read_text() == 'precious'
+    monkeypatch.setitem(sys.modules, 'numpy', None)
+    with pytest.raises(SystemExit):
+        main(ARGS)
+    assert capsys.readouterr().err == "rsg: error: rsg needs NumPy: pip install random_sum_generator[numpy]\n"
@@ -0,0 +1,43 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from random_sum_generator import RandomSumGenerator  # noqa: E402
+from random_sum_generator.counter import philox4x32  # noqa: E402
+
+# Philox4x32-10 known-answer vectors from Random123 (kat_vectors): counter, key, output.
+KAT = [
+    ((0x00000000, 0x00000000, 0x00000000, 0x00000000), (0x00000000, 0x00000000),
+     (0x6627e8d5, 0xe169c58d, 0xbc57ac4c, 0x9b00dbd8)),
+    ((0xffffffff, 0xffffffff, 0xffffffff, 0xffffffff), (0xffffffff, 0xffffffff),
+     (0x408f276d, 0x41c83b0e, 0xa20bc7c6, 0x6d5451fd)),
+    ((0x243f6a88, 0x85a308d3, 0x13198a2e, 0x03707344), (0xa4093822, 0x299f31d0),
+     (0xd16cfe09, 0x94fdcceb, 0x5001e420, 0x24126ea1)),
+]
+CASES = [
+    dict(total=100, parts=8, min_val=2, max_val=40),
+    dict(total=50, parts=5, min_val=[0, 2, 4, 0, 0], max_val=[20, 20, 15, 30, 10], mode='int'),
+]
+
+
+@pytest.mark.parametrize('counter, key, expected', KAT)
+def test_philox_known_answers(counter, key, expected):
+    assert tuple(int(w) for w in philox4x32(counter, key)) == expected
+
+
+def test_philox_is_vectorized_over_counters():
+    counters = [np.array([c[i] for c, _, _ in KAT[:2]]) for i in range(4)]
+    words = philox4x32(counters, (0, 0))
+    assert [int(w[0]) for w in words] == list(KAT[0][2])
+
+
+@pytest.mark.parametrize('method', ['auto', 'dirichlet', 'rejection', 'exact', 'dp'])
+@pytest.mark.parametrize('case', CASES, ids=['float', 'int'])
+def test_row_depends_only_on_its_index(method, case):
+    gen = RandomSumGenerator(seed=11)
+    rows = gen.generate_range(40, 90, method=method, **case)
+    for i in (40, 41, 63, 89):
+        assert gen.generate_at(i, method=method, **case) == rows[i - 40].tolist()
+    # Other slices, other generators with the same seed: the same rows.
+    assert (RandomSumGenerator(seed=11).generate_range(60, 70, method=method, **case) == rows[20:30]).all()
+    assert not (RandomSumGenerator(seed=12).generate_range(40, 90, method=method, **case) == rows).all()
@@ -0,0 +1,35 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from random_sum_generator import RandomSumGenerator  # noqa: E402
+
+CASE = dict(total=100, parts=8, min_val=2, max_val=40)
+
+
+@pytest.mark.parametrize('method', ['dirichlet', 'rejection', 'exact', 'dp'])
+@pytest.mark.parametrize('mode, dtype', [('float', np.float64), ('float', np.float32), ('int', np.int64),
+                                         ('int', np.int32)])
+def test_batch_out_matches_return_value(method, mode, dtype):
+    expected = RandomSumGenerator(seed=4).generate_batch(500, mode=mode, method=method, **CASE)
+    out = np.empty((500, 8), dtype=dtype)
+    assert RandomSumGenerator(seed=4).generate_batch(500, mode=mode, method=method, out=out, **CASE) is out
+    assert np.allclose(out, expected, atol=1e-5)
+
+
+def test_batch_out_checked_before_sampling():
+    gen = RandomSumGenerator(seed=4)
+    with pytest.raises(ValueError, match='shape'):
+        gen.generate_batch(500, out=np.empty((499, 8)), **CASE)
+    with pytest.raises(ValueError, match='dtype'):
+        gen.generate_batch(500, mode='int', out=np.empty((500, 8)), **CASE)
+    # Nothing was drawn: the stream is where a fresh generator's is.
+    assert (gen.generate_batch(5, **CASE) == RandomSumGenerator(seed=4).generate_batch(5, **CASE)).all()
+
+
+@pytest.mark.parametrize('method', ['exact', 'dp'])
+@pytest.mark.parametrize('mode, dtype', [('float', np.float64), ('int', np.int32)])
+def test_single_out_matches_list_path(method, mode, dtype):
+    out = np.empty(8, dtype=dtype)
+    RandomSumGenerator(seed=4).generate(mode=mode, method=method, out=out, **CASE)
+    assert np.allclose(out, RandomSumGenerator(seed=4).generate(mode=mode, method=method, **CASE))
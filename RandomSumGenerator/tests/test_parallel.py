@@ -0,0 +1,32 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from random_sum_generator import RandomSumGenerator  # noqa: E402
+
+CASE = dict(total=100, parts=8, min_val=2, max_val=40)
+
+
+@pytest.mark.parametrize('mode', ['float', 'int'])
+def test_output_does_not_depend_on_workers(mode):
+    rows = [RandomSumGenerator(seed=9).generate_many(1000, mode=mode, workers=w, shard_size=128, **CASE)
+            for w in (1, 2, 3)]
+    assert rows[0].shape == (1000, 8)
+    assert all((r == rows[0]).all() for r in rows[1:])
+    assert np.allclose(rows[0].sum(axis=1), 100)
+
+
+def test_shards_are_seeded_from_the_generator():
+    gen = RandomSumGenerator(seed=9)
+    first = gen.generate_many(300, workers=1, shard_size=128, **CASE)
+    second = gen.generate_many(300, workers=1, shard_size=128, **CASE)
+    assert not (first == second).all()
+    # Different shard sizes cut the stream differently, but each shard is still valid.
+    other = RandomSumGenerator(seed=9).generate_many(300, workers=1, shard_size=100, **CASE)
+    assert other.shape == first.shape and not (other == first).all()
+
+
+def test_worker_stats_are_merged():
+    gen = RandomSumGenerator(seed=9, stats=True)
+    gen.generate_many(1000, workers=2, shard_size=128, **CASE)
+    assert gen.stats.samples == 1000 and gen.stats.calls == 8
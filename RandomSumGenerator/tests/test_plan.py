@@ -0,0 +1,37 @@
+from random_sum_generator import RandomSumGenerator
+
+FALLBACK = [
+    dict(total=1000, parts=100, min_val=2, max_val=15),
+    dict(total=100000, parts=10000, min_val=2, max_val=40, mode='int'),
+]
+
+
+def test_auto_falls_back_when_no_uniform_engine_is_practical():
+    # Neither 'dirichlet' (caps bind on 100+ parts) nor 'dp' (table too large) is
+    # practical; the baseline's 'rejection' accepts almost every draw.
+    for case in FALLBACK:
+        gen = RandomSumGenerator(seed=1)
+        plan = gen.plan(**case)
+        assert plan['method'] == plan['target'] == 'rejection' and plan['fallback']
+        assert sum(gen.generate(**case)) == case['total']
+        assert gen.last_method == 'rejection'
+
+
+def test_auto_falls_back_to_exact_when_rejection_is_too_tight():
+    gen = RandomSumGenerator(seed=1)
+    case = dict(total=1000, parts=100, min_val=2, max_val=10.5)
+    assert gen.plan(**case)['method'] == 'exact'
+    assert round(sum(gen.generate(**case)), 2) == 1000
+
+
+def test_uniform_plan_has_no_fallback():
+    plan = RandomSumGenerator().plan(100, 4, min_val=[10, 0, 5, 15], max_val=[30, 50, 25, 40])
+    assert plan['target'] == 'uniform' and 'fallback' not in plan
+
+
+def test_auto_keeps_dirichlet_when_its_pilot_accepts_nothing():
+    # True acceptance is ~1%, so the 64-draw pilot usually sees none; that is not "impossible".
+    gen = RandomSumGenerator(seed=1)
+    assert gen.plan(100, 4, 5, 30, alpha=[1, 2, 3, 4])['method'] == 'dirichlet'
+    assert round(sum(gen.generate(100, 4, 5, 30, alpha=[1, 2, 3, 4])), 2) == 100
+    assert gen.last_method == 'dirichlet'
@@ -0,0 +1,61 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from random_sum_generator import RandomSumGenerator  # noqa: E402
+
+# x0 + x1 <= 40 and x2 = x3 on top of sum(x) = 100, 0 <= x <= 60.
+CASE = dict(total=100, parts=5, max_val=60, A_ub=[[1, 1, 0, 0, 0]], b_ub=[40], A_eq=[[0, 0, 1, -1, 0]], b_eq=[0])
+
+
+def test_samples_satisfy_every_constraint():
+    x = RandomSumGenerator(seed=7).polytope(**CASE).sample(2000)
+    assert x.shape == (2000, 5)
+    assert np.allclose(x.sum(axis=1), 100)
+    assert (x >= -1e-9).all() and (x <= 60 + 1e-9).all()
+    assert (x[:, 0] + x[:, 1] <= 40 + 1e-9).all()
+    assert np.allclose(x[:, 2], x[:, 3])
+
+
+def test_uniform_on_the_simplex():
+    # Without extra constraints the first part of a uniform split of 1 into 3 is Beta(1, 2).
+    x = RandomSumGenerator(seed=7).polytope(1, 3).sample(4000)[:, 0]
+    assert abs(x.mean() - 1 / 3) < 0.02 and abs(x.var() - 1 / 18) < 0.01
+
+
+def test_rounded_samples_keep_the_total():
+    x = RandomSumGenerator(seed=7).polytope(**CASE, precision=1).sample(100)
+    assert np.allclose(x.sum(axis=1), 100) and np.allclose(x * 10, np.round(x * 10))
+
+
+def test_chain_state():
+    sampler = RandomSumGenerator(seed=7).polytope(**CASE, burn_in=50, thin=2)
+    assert sampler.sample(0).shape == (0, 5) and sampler.steps == 0
+    assert len(sampler.sample()) == 5 and sampler.steps == 52
+    # Later calls continue the chain without a second burn-in.
+    sampler.sample(10)
+    assert sampler.steps == 72
+    first = RandomSumGenerator(seed=7).polytope(**CASE).sample(20)
+    assert np.array_equal(first, RandomSumGenerator(seed=7).polytope(**CASE).sample(20))
+
+
+def test_pinned_parts():
+    x = RandomSumGenerator(seed=7).polytope(10, 3, min_val=[0, 4, 0], max_val=[10, 4, 10]).sample(100)
+    assert np.allclose(x[:, 1], 4) and np.allclose(x.sum(axis=1), 10)
+
+
+@pytest.mark.parametrize('kwargs, match', [
+    (dict(total=10, parts=3, A_ub=[[1, 1]], b_ub=[1]), 'shape'),
+    (dict(total=10, parts=3, A_eq=[[1, 1, 1]], b_eq=[5]), 'inconsistent'),
+    (dict(total=10, parts=3, A_ub=[[1, 1, 0]], b_ub=[-1]), 'infeasible'),
+    (dict(total=10, parts=3, min_val=[5, 0, 0], max_val=[4, 10, 10]), 'exceed'),
+])
+def test_bad_constraints_raise(kwargs, match):
+    with pytest.raises(ValueError, match=match):
+        RandomSumGenerator(seed=7).polytope(**kwargs)
+
+
+def test_unbounded_polytope_raises():
+    sampler = RandomSumGenerator(seed=7).polytope(10, 3, min_val=[0, -np.inf, 0], max_val=np.inf)
+    with pytest.raises(ValueError, match='bound'):
+        sampler.sample()
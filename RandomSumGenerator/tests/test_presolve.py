@@ -0,0 +1,41 @@
+import itertools
+
+import pytest
+
+from random_sum_generator import RandomSumGenerator
+
+
+def test_report_for_asymmetric_caps():
+    assert RandomSumGenerator().presolve(100, 5, max_val=[100, 10, 10, 10, 10]) == {
+        'min': [60.0, 0.0, 0.0, 0.0, 0.0], 'max': [100.0, 10.0, 10.0, 10.0, 10.0],
+        'redundant_min': [0], 'redundant_max': [0], 'binding_min': [1, 2, 3, 4], 'binding_max': [1, 2, 3, 4],
+        'fixed': []}
+
+
+def test_scalar_bounds_can_pin_every_part():
+    report = RandomSumGenerator().presolve(100, 4, min_val=5, max_val=25, mode='int')
+    assert report['min'] == report['max'] == [25] * 4
+    # The caps force x_i >= 100 - 3 * 25 = 25, stricter than min_val=5; min_val only
+    # implies x_i <= 85, looser than the caps.
+    assert report['fixed'] == [0, 1, 2, 3] and report['redundant_min'] == [0, 1, 2, 3]
+    assert report['binding_max'] == [0, 1, 2, 3] and report['binding_min'] == report['redundant_max'] == []
+    assert RandomSumGenerator().generate(100, 4, min_val=5, max_val=25, mode='int') == [25] * 4
+
+
+@pytest.mark.parametrize('total, lo, hi', [(7, [0, 2, 1], [3, 5, 2]), (9, [1, 0, 0, 2], [2, 6, 6, 3]),
+                                           (4, [0, 0, 0], [4, 4, 4])])
+def test_intervals_are_exact(total, lo, hi):
+    # Every value in a tightened interval appears in some valid split, and no other does.
+    report = RandomSumGenerator().presolve(total, len(lo), min_val=lo, max_val=hi, mode='int')
+    splits = [c for c in itertools.product(*(range(a, b + 1) for a, b in zip(lo, hi))) if sum(c) == total]
+    assert report['min'] == [min(c[i] for c in splits) for i in range(len(lo))]
+    assert report['max'] == [max(c[i] for c in splits) for i in range(len(lo))]
+
+
+@pytest.mark.parametrize('method', ['auto', 'exact', 'dp', 'dirichlet', 'rejection'])
+def test_samples_stay_in_the_intervals(method):
+    gen = RandomSumGenerator(seed=8)
+    report = gen.presolve(100, 5, max_val=[100, 10, 10, 10, 10])
+    for _ in range(50):
+        row = gen.generate(100, 5, max_val=[100, 10, 10, 10, 10], method=method)
+        assert all(a - 1e-9 <= v <= b + 1e-9 for v, a, b in zip(row, report['min'], report['max']))
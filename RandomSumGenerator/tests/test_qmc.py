@@ -0,0 +1,39 @@
+import itertools
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from random_sum_generator import RandomSumGenerator  # noqa: E402
+
+SMALL = dict(total=12, parts=4, max_val=[12, 2, 3, 12], mode='int')
+
+
+def test_rows_are_uniform_within_the_bounds():
+    support = [c for c in itertools.product(*(range(h + 1) for h in SMALL['max_val'])) if sum(c) == SMALL['total']]
+    rows = np.vstack([RandomSumGenerator(seed=s).generate_qmc(256, **SMALL) for s in range(60)])
+    counts = {c: 0 for c in support}
+    for row in rows.astype(int):
+        counts[tuple(row)] += 1
+    expected = len(rows) / len(support)
+    chi2 = sum((c - expected) ** 2 / expected for c in counts.values())
+    assert chi2 < 2 * len(support)
+
+
+def test_capped_parts_match_generate():
+    case = dict(total=100, parts=5, max_val=[100, 10, 10, 10, 10])
+    qmc = np.vstack([RandomSumGenerator(seed=s).generate_qmc(1024, **case) for s in range(10)])
+    assert abs(qmc[:, 1:].mean() - 5.0) < 0.1   # the exact construction gave 5.88
+
+
+@pytest.mark.parametrize('sequence', ['halton', 'lhs'])
+def test_rows_are_valid(sequence):
+    rows = RandomSumGenerator(seed=1).generate_qmc(500, 100, 8, min_val=2, max_val=40, sequence=sequence)
+    assert np.allclose(rows.sum(axis=1), 100) and (rows >= 2).all() and (rows <= 40).all()
+
+
+def test_skip_continues_the_sequence():
+    rows = RandomSumGenerator(seed=3).generate_qmc(100, **SMALL)
+    assert (RandomSumGenerator(seed=3).generate_qmc(40, skip=60, **SMALL) == rows[60:]).all()
+    with pytest.raises(ValueError, match='lhs'):
+        RandomSumGenerator(seed=3).generate_qmc(40, skip=60, sequence='lhs', **SMALL)
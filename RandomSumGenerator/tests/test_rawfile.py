@@ -0,0 +1,37 @@
+import struct
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from random_sum_generator import RandomSumGenerator, rawfile  # noqa: E402
+
+CASE = dict(total=100, parts=8, min_val=2, max_val=40)
+
+
+def _interrupt(path, completed):
+    # Pretend the run died after `completed` chunks: reset the counter, wipe the rest.
+    header = rawfile.read_header(path)
+    n_samples, parts = header['shape']
+    start = completed * header['chunk_size']
+    with open(path, 'r+b') as f:
+        f.seek(rawfile.COUNTER_OFFSET)
+        f.write(struct.pack('<Q', completed))
+        f.seek(header['offset'] + start * parts * 8)
+        f.write(b'\0' * (n_samples - start) * parts * 8)
+
+
+@pytest.mark.parametrize('seed', [7, None])
+def test_resume_matches_uninterrupted_run(tmp_path, seed):
+    path = tmp_path / 'samples.rsg'
+    full = np.array(RandomSumGenerator(seed=seed).generate_file(path, 1000, chunk_size=100, **CASE))
+    _interrupt(path, 3)
+    resumed = RandomSumGenerator(seed=seed).generate_file(path, 1000, chunk_size=100, **CASE)
+    assert (np.asarray(resumed) == full).all()
+
+
+def test_resume_names_changed_arguments(tmp_path):
+    path = tmp_path / 'samples.rsg'
+    RandomSumGenerator(seed=7).generate_file(path, 100, chunk_size=10, **CASE)
+    with pytest.raises(ValueError, match=r"different chunk_size, seed\.entropy;"):
+        RandomSumGenerator(seed=8).generate_file(path, 100, chunk_size=20, **CASE)
@@ -0,0 +1,43 @@
+import itertools
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from random_sum_generator import RandomSumGenerator  # noqa: E402
+
+TOTALS = [100, 50, 10, 30]
+LO = [[0, 5, 5, 0], [2, 2, 2, 2], [0, 0, 0, 0], [10, 10, 10, 10]]
+HI = [[50, 50, 50, 50], [20, 20, 20, 20], [4, 4, 4, 4], [20, 20, 20, 20]]
+
+
+@pytest.mark.parametrize('method', ['exact', 'auto', 'dirichlet', 'rejection'])
+def test_rows_respect_their_own_total_and_bounds(method):
+    values, feasible = RandomSumGenerator(seed=1).generate_rows(np.repeat(TOTALS, 50), min_val=np.repeat(LO, 50, 0),
+                                                                max_val=np.repeat(HI, 50, 0), method=method)
+    assert values.shape == (200, 4)
+    # Row 3 needs at least 40 but its total is 30: flagged and zeroed, not raised on.
+    assert feasible.tolist() == [True] * 150 + [False] * 50
+    assert (values[150:] == 0).all()
+    ok = values[:150]
+    assert np.allclose(ok.sum(axis=1), np.repeat(TOTALS[:3], 50))
+    assert (ok >= np.repeat(LO[:3], 50, 0)).all() and (ok <= np.repeat(HI[:3], 50, 0)).all()
+
+
+def test_auto_is_uniform_like_generate():
+    caps = [12, 2, 3, 12]
+    support = [c for c in itertools.product(*(range(h + 1) for h in caps)) if sum(c) == 12]
+    gen = RandomSumGenerator(seed=2)
+    values, _ = gen.generate_rows(np.full(60 * len(support), 12), max_val=caps, mode='int', method='auto')
+    assert gen.last_method == 'dirichlet'
+    counts = dict.fromkeys(support, 0)
+    for row in values:
+        counts[tuple(int(v) for v in row)] += 1
+    expected = len(values) / len(support)
+    assert sum((c - expected) ** 2 / expected for c in counts.values()) < 2 * len(support)
+
+
+def test_default_is_exact():
+    gen = RandomSumGenerator(seed=2)
+    gen.generate_rows([10, 20], parts=3)
+    assert gen.last_method == 'exact'
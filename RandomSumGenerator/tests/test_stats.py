@@ -0,0 +1,44 @@
+import pytest
+
+from random_sum_generator import RandomSumGenerator
+
+# Only part 0 can break a bound: the others may take the whole total.
+CASE = dict(total=100, parts=4, max_val=[10, 100, 100, 100])
+
+
+@pytest.mark.parametrize('method', ['rejection', 'dirichlet'])
+def test_counters_explain_every_rejection(method):
+    gen = RandomSumGenerator(seed=3, stats=True)
+    for _ in range(50):
+        gen.generate(method=method, **CASE)
+    stats = gen.stats
+    assert (stats.calls, stats.samples, stats.failures) == (50, 50, 0)
+    assert stats.attempts > 50 and stats.mean_attempts == stats.attempts / 50
+    assert dict(stats.rejections_max) == {0: stats.rejections} and not stats.rejections_min
+    assert stats.methods == {method: 50} and sum(stats.acceptance_histogram) == 50
+
+
+def test_batch_and_single_paths_share_the_counters():
+    pytest.importorskip('numpy')
+    gen = RandomSumGenerator(seed=3, stats=True)
+    gen.generate_batch(200, method='rejection', **CASE)
+    gen.generate(method='exact', **CASE)
+    assert gen.stats.samples == 201 and gen.stats.methods == {'rejection': 1, 'exact': 1}
+    assert set(gen.stats.rejections_max) == {0}
+    merged = RandomSumGenerator(stats=True).stats.merge(gen.stats)
+    assert merged.as_dict() == gen.stats.as_dict()
+
+
+def test_failures_are_counted_before_raising():
+    gen = RandomSumGenerator(seed=3, stats=True)
+    with pytest.raises(RuntimeError):
+        gen.generate(total=100, parts=4, max_val=[0.01, 100, 100, 100], method='dirichlet', max_attempts=2)
+    assert (gen.stats.calls, gen.stats.failures, gen.stats.attempts, gen.stats.samples) == (1, 1, 2, 0)
+
+
+def test_on_sample_sees_every_result():
+    seen = []
+    gen = RandomSumGenerator(seed=3, on_sample=lambda result, method: seen.append((result, method)))
+    row = gen.generate(method='exact', **CASE)
+    assert seen == [(row, 'exact')]
+    assert RandomSumGenerator(seed=3).stats is None
@@ -0,0 +1,34 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from random_sum_generator import RandomSumGenerator
+
+CASE = dict(total=100, parts=4, min_val=5, max_val=40)
+
+
+def test_generators_do_not_share_state():
+    ref = RandomSumGenerator(seed=1)
+    alone = [ref.generate(**CASE) for _ in range(3)]
+    state = random.getstate()
+    a, b = RandomSumGenerator(seed=1), RandomSumGenerator(seed=2)
+    interleaved = []
+    for _ in range(3):
+        b.generate(**CASE)
+        interleaved.append(a.generate(**CASE))
+    assert interleaved == alone
+    # The module-level generator is neither seeded nor consumed.
+    assert random.getstate() == state
+
+
+def test_spawn_is_reproducible_and_independent():
+    def rows(children):
+        with ThreadPoolExecutor(len(children)) as pool:
+            return list(pool.map(lambda g: [g.generate(**CASE) for _ in range(20)], children))
+
+    first, second = rows(RandomSumGenerator(seed=5).spawn(4)), rows(RandomSumGenerator(seed=5).spawn(4))
+    assert first == second
+    assert len({tuple(map(tuple, child)) for child in first}) == 4
+    # A second spawn continues the numbering instead of repeating the children.
+    gen = RandomSumGenerator(seed=5)
+    gen.spawn(4)
+    assert rows(gen.spawn(1))[0] not in first
@@ -0,0 +1,45 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from random_sum_generator import RandomSumGenerator  # noqa: E402
+
+
+def test_int_table_keeps_margins_and_caps():
+    gen = RandomSumGenerator(seed=5)
+    for _ in range(20):
+        table = gen.generate_table([10, 20, 30], [15, 15, 30], max_cell=12, mode='int')
+        assert table.shape == (3, 3) and np.issubdtype(table.dtype, np.integer)
+        assert table.sum(axis=1).tolist() == [10, 20, 30] and table.sum(axis=0).tolist() == [15, 15, 30]
+        assert (table >= 0).all() and (table <= 12).all()
+
+
+def test_float_table_on_grid_with_cell_bounds():
+    rng = np.random.default_rng(0)
+    rows, cols = np.full(40, 30.0), np.full(30, 40.0)
+    lo = np.where(rng.random((40, 30)) < 0.1, 1.5, 0.25)
+    table = RandomSumGenerator(seed=5).generate_table(rows, cols, min_cell=lo, max_cell=2.0)
+    assert np.allclose(table.sum(axis=1), rows) and np.allclose(table.sum(axis=0), cols)
+    assert (table >= lo - 1e-9).all() and (table <= 2.0 + 1e-9).all()
+    assert np.allclose(table * 100, np.round(table * 100))
+
+
+def test_small_table_is_uniform():
+    # 2x2 tables with margins (3, 3): the top-left cell fixes the rest and takes 0..3.
+    gen = RandomSumGenerator(seed=5)
+    counts = np.bincount([int(gen.generate_table([3, 3], [3, 3], mode='int')[0, 0]) for _ in range(2000)],
+                         minlength=4)
+    assert (np.abs(counts - 500) < 90).all()
+
+
+@pytest.mark.parametrize('kwargs, match', [
+    (dict(row_sums=[10, 10], col_sums=[5, 10]), 'same total'),
+    (dict(row_sums=[10, 10], col_sums=[10, 10], max_cell=4), 'max_cell is too low'),
+    # Every row and column could reach its sum, but rows 0 and 1 both need all of column 0.
+    (dict(row_sums=[2, 2, 2], col_sums=[2, 2, 2], max_cell=[[2, 0, 0], [2, 0, 0], [2, 2, 2]]), 'cell bounds'),
+    (dict(row_sums=[1.234, 1], col_sums=[1.234, 1]), 'grid'),
+    (dict(row_sums=[], col_sums=[]), 'non-empty'),
+])
+def test_invalid_tables_raise(kwargs, match):
+    with pytest.raises(ValueError, match=match):
+        RandomSumGenerator(seed=5).generate_table(**kwargs)
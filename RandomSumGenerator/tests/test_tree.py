@@ -0,0 +1,57 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from random_sum_generator import RandomSumGenerator  # noqa: E402
+
+TREE = {'total': 100, 'name': 'root', 'children': [
+    {'name': 'a', 'min': 10, 'max': 60, 'children': [{'max': 30}, {'max': 30}, {'min': 5}]},
+    {'name': 'b', 'total': 25, 'children': [{'min': 5}, {'min': 5, 'max': 12}]},
+    {'name': 'c', 'max': 40},
+]}
+
+
+def test_families_sum_to_their_parent():
+    values, offsets = RandomSumGenerator(seed=6).generate_tree(TREE, 500, mode='int')
+    assert values.shape == (500, 9) and offsets.tolist() == [0, 1, 4, 9]
+    assert (values[:, 0] == 100).all()
+    assert (values[:, 1:4].sum(axis=1) == 100).all()
+    assert (values[:, 4:7].sum(axis=1) == values[:, 1]).all()
+    assert (values[:, 7:9].sum(axis=1) == values[:, 2]).all()
+    assert (values[:, 2] == 25).all()
+    assert ((values[:, 1] >= 10) & (values[:, 1] <= 60)).all() and (values[:, 3] <= 40).all()
+    assert (values[:, 4:6] <= 30).all() and (values[:, 6] >= 5).all()
+    assert (values[:, 7] >= 5).all() and ((values[:, 8] >= 5) & (values[:, 8] <= 12)).all()
+    # Not a fixed point: the free nodes actually vary.
+    assert len(np.unique(values[:, 1])) > 10
+
+
+def test_float_tree_on_grid():
+    values, _ = RandomSumGenerator(seed=6).generate_tree(TREE, 200, precision=1)
+    assert np.allclose(values[:, 1:4].sum(axis=1), 100)
+    assert np.allclose(values[:, 4:7].sum(axis=1), values[:, 1])
+    assert np.allclose(values * 10, np.round(values * 10))
+
+
+def test_shapes():
+    gen = RandomSumGenerator(seed=6)
+    single, _ = gen.generate_tree(TREE, mode='int')
+    assert single.shape == (9,) and single[0] == 100
+    assert gen.generate_tree(TREE, 0)[0].shape == (0, 9)
+
+
+def test_intervals_are_propagated():
+    # c <= 40 and b = 25 leave a at least 35; a's children can reach at most 100.
+    lo, hi = RandomSumGenerator().compile_tree(TREE, mode='int').intervals()
+    assert lo[:4].tolist() == [100, 35, 25, 15] and hi[:4].tolist() == [100, 60, 25, 40]
+
+
+def test_infeasible_tree_names_the_node():
+    # left's children need at least 6, more than its max.
+    tree = {'total': 10, 'children': [{'name': 'left', 'max': 5, 'children': [{'min': 3}, {'min': 3}]}, {}]}
+    with pytest.raises(ValueError, match='left'):
+        RandomSumGenerator().generate_tree(tree)
+    with pytest.raises(ValueError, match='node 0'):
+        RandomSumGenerator().generate_tree({'total': 10, 'children': [{'min': 6}, {'min': 6}]})
+    with pytest.raises(ValueError, match="'total'"):
+        RandomSumGenerator().generate_tree({'children': []})